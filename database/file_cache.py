@@ -0,0 +1,171 @@
+import time
+import logging
+import threading
+from collections import OrderedDict
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+logger = logging.getLogger(__name__)
+
+# ─────────────────────────────────────
+# 🧠 PER-PROCESS FILE MEMO
+# ─────────────────────────────────────
+# Per-tier file counts + recent get_file_details docs, kept in memory.
+#
+# A change stream per tier keeps them current with inserts/deletes made by
+# ANY bot instance. Without change streams (standalone mongod, no
+# permission, ...) entries simply expire after `ttl` seconds.
+#
+# Counts are re-validated every `ttl` seconds even with a live stream
+# (an event racing the count can skew it until then), and a count is not
+# cached if an insert/delete event arrived while it ran.
+
+WATCH_RETRY_SECONDS = 5
+
+
+class FileMemo:
+
+    def __init__(self, ttl: float = 60, max_details: int = 1000, decode=None):
+        self.ttl = ttl
+        self.max_details = max_details
+        self.decode = decode or (lambda file_id: file_id)
+
+        self.lock = threading.Lock()
+        self.counts = {}                # db_type → (time, count)
+        self.count_events = {}          # db_type → insert/delete events seen
+        self.details = OrderedDict()    # file_id → (time, db_type, doc)
+        self.live = set()               # tiers with a running change stream
+        self.watchers = {}              # db_type → thread
+
+    # ── freshness ──
+    def _fresh(self, db_type: str, stamp: float) -> bool:
+        return db_type in self.live or time.time() - stamp < self.ttl
+
+    # ── counts ──
+    def get_count(self, db_type: str):
+        with self.lock:
+            entry = self.counts.get(db_type)
+            if entry and time.time() - entry[0] < self.ttl:
+                return entry[1]
+            return None
+
+    def count_token(self, db_type: str) -> int:
+        """
+        Take before counting, pass to set_count afterwards
+        """
+        with self.lock:
+            return self.count_events.get(db_type, 0)
+
+    def set_count(self, db_type: str, count: int, token: int | None = None):
+        with self.lock:
+            # an event landed mid-count → unclear if included, recount next time
+            if token is not None and token != self.count_events.get(db_type, 0):
+                self.counts.pop(db_type, None)
+                return
+            self.counts[db_type] = (time.time(), count)
+
+    def local_write(self, db_type: str):
+        """
+        This process wrote to db_type; a live stream will report it,
+        otherwise drop the count so it is recounted
+        """
+        if db_type not in self.live:
+            with self.lock:
+                self.counts.pop(db_type, None)
+
+    # ── details ──
+    def get_details(self, file_id: str):
+        with self.lock:
+            entry = self.details.get(file_id)
+            if not entry:
+                return None
+            stamp, db_type, doc = entry
+            if not self._fresh(db_type, stamp):
+                del self.details[file_id]
+                return None
+            self.details.move_to_end(file_id)
+            return dict(doc)
+
+    def set_details(self, file_id: str, db_type: str, doc: dict):
+        with self.lock:
+            self.details[file_id] = (time.time(), db_type, dict(doc))
+            self.details.move_to_end(file_id)
+            while len(self.details) > self.max_details:
+                self.details.popitem(last=False)
+
+    # ── invalidation ──
+    def clear(self, db_type: str):
+        with self.lock:
+            self.counts.pop(db_type, None)
+            # also voids counts in flight
+            self.count_events[db_type] = self.count_events.get(db_type, 0) + 1
+            for file_id in [
+                key for key, entry in self.details.items()
+                if entry[1] == db_type
+            ]:
+                del self.details[file_id]
+
+    def apply_change(self, db_type: str, change: dict):
+        """
+        Apply one change stream event of db_type's search collection
+        """
+        op = change.get("operationType")
+
+        if op in ("drop", "dropDatabase", "rename", "invalidate"):
+            self.clear(db_type)
+            return
+
+        key = change.get("documentKey", {}).get("_id")
+        file_id = self.decode(key) if key is not None else None
+
+        with self.lock:
+            if op in ("insert", "delete"):
+                self.count_events[db_type] = self.count_events.get(db_type, 0) + 1
+                entry = self.counts.get(db_type)
+                if entry:
+                    step = 1 if op == "insert" else -1
+                    self.counts[db_type] = (entry[0], max(entry[1] + step, 0))
+
+            if op in ("delete", "update", "replace") and file_id is not None:
+                self.details.pop(file_id, None)
+
+    # ── change streams ──
+    def watch(self, db_type: str, collection):
+        """
+        Start (once) a daemon thread following collection's change stream
+        """
+        with self.lock:
+            if db_type in self.watchers:
+                return
+            thread = threading.Thread(
+                target=self._watch_loop,
+                args=(db_type, collection),
+                name=f"file-memo-{db_type}",
+                daemon=True
+            )
+            self.watchers[db_type] = thread
+        thread.start()
+
+    def _watch_loop(self, db_type: str, collection):
+        while True:
+            try:
+                with collection.watch() as stream:
+                    # events may have been missed before (re)opening
+                    self.clear(db_type)
+                    self.live.add(db_type)
+                    logger.info(f"[{db_type.upper()}] File memo following change stream")
+                    for change in stream:
+                        self.apply_change(db_type, change)
+            except OperationFailure as e:
+                # not a replica set / not permitted → TTL only, for good
+                self.live.discard(db_type)
+                logger.warning(
+                    f"[{db_type.upper()}] Change streams unavailable, "
+                    f"file memo uses {self.ttl}s TTL: {e}"
+                )
+                return
+            except PyMongoError as e:
+                self.live.discard(db_type)
+                logger.warning(f"[{db_type.upper()}] Change stream lost, retrying: {e}")
+            self.clear(db_type)
+            time.sleep(WATCH_RETRY_SECONDS)
@@ -0,0 +1,188 @@
+import csv
+import gzip
+import json
+import logging
+
+from pymongo import ReplaceOne
+
+from database.ia_filterdb import (
+    FACET_FIELDS,
+    SPLIT_CAPTIONS,
+    get_collection,
+    get_read_collection,
+    get_read_caption_collection,
+    tier_names,
+    tier_is_writable,
+    find_matches,
+    encode_file_id,
+    decode_file_id,
+    extract_facets,
+    insert_documents
+)
+
+logger = logging.getLogger(__name__)
+
+# ─────────────────────────────────────
+# 📤 STREAMING EXPORT / 📥 BULK IMPORT
+# ─────────────────────────────────────
+# gzip CSV or JSONL, one file per row, written/read batch by batch
+# → memory stays flat no matter how many files a tier holds.
+# Blocking – run with asyncio.to_thread from handlers.
+
+EXPORT_FIELDS = ("_id", "file_name", "file_size", "caption", "db") + FACET_FIELDS
+EXPORT_FORMATS = ("jsonl", "csv")
+
+
+def _batches(iterable, size: int):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _export_rows(db_type: str, query: str | None, facets: dict | None, batch_size: int):
+    col = get_read_collection(db_type)
+    if col is None:
+        return
+
+    if query or facets:
+        cursor = find_matches(col, query or "", facets, batch_size=batch_size)
+    else:
+        cursor = col.find({}).batch_size(batch_size)
+
+    for batch in _batches(cursor, batch_size):
+        # split captions → one $in lookup per batch
+        captions = {}
+        if SPLIT_CAPTIONS:
+            captions = {
+                doc["_id"]: doc["caption"]
+                for doc in get_read_caption_collection(db_type).find(
+                    {"_id": {"$in": [doc["_id"] for doc in batch]}}
+                )
+            }
+
+        for doc in batch:
+            row = {field: doc.get(field) for field in EXPORT_FIELDS}
+            row["caption"] = doc.get("caption", captions.get(doc["_id"], ""))
+            row["_id"] = decode_file_id(doc["_id"])
+            row["db"] = db_type
+            yield row
+
+
+def export_files(
+    path: str,
+    db_type: str | None = None,
+    query: str | None = None,
+    facets: dict | None = None,
+    fmt: str = "jsonl",
+    batch_size: int = 1000
+) -> int:
+    """
+    Stream one tier (or all, db_type=None) to a gzip file at `path`
+    Returns rows written
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+
+    db_types = [db_type] if db_type else tier_names()
+    written = 0
+
+    with gzip.open(path, "wt", encoding="utf-8", newline="") as out:
+        writer = None
+        if fmt == "csv":
+            writer = csv.DictWriter(out, fieldnames=EXPORT_FIELDS)
+            writer.writeheader()
+
+        for name in db_types:
+            for row in _export_rows(name, query, facets, batch_size):
+                if writer:
+                    writer.writerow(row)
+                else:
+                    out.write(json.dumps(row, ensure_ascii=False) + "\n")
+                written += 1
+
+    logger.info(f"Exported {written} files → {path}")
+    return written
+
+
+def _read_rows(path: str):
+    name = path.lower()
+    opener = gzip.open if name.endswith(".gz") else open
+    if name.endswith(".gz"):
+        name = name[:-3]
+
+    with opener(path, "rt", encoding="utf-8", newline="") as src:
+        if name.endswith(".csv"):
+            yield from csv.DictReader(src)
+        else:
+            for line in src:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def _int_or_none(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _row_to_document(row: dict, db_type: str):
+    file_name = row["file_name"]
+    document = {
+        "_id": encode_file_id(str(row["_id"])),
+        "file_name": file_name,
+        "file_size": _int_or_none(row.get("file_size")),
+        "db": db_type
+    }
+
+    facets = extract_facets(file_name)
+    for field in FACET_FIELDS:
+        value = row.get(field)
+        if value not in (None, ""):
+            facets[field] = value if field in ("ext", "res") else _int_or_none(value)
+    document.update({k: v for k, v in facets.items() if v is not None})
+
+    caption = row.get("caption") or ""
+    if not SPLIT_CAPTIONS:
+        document["caption"] = caption
+    return document, caption
+
+
+def import_files(path: str, db_type: str, batch_size: int = 1000) -> dict:
+    """
+    Bulk-load an export file into one tier (insert_many per batch)
+    Returns {"suc": n, "dup": n, "err": n}
+    """
+    stats = {"suc": 0, "dup": 0, "err": 0}
+    if get_collection(db_type) is None:
+        raise ValueError(f"Unknown database: {db_type}")
+    if not tier_is_writable(db_type):
+        raise ValueError(f"Read-only database: {db_type}")
+
+    for batch in _batches(_read_rows(path), batch_size):
+        documents = []
+        captions = []
+        for row in batch:
+            try:
+                document, caption = _row_to_document(row, db_type)
+            except (KeyError, ValueError, TypeError) as e:
+                logger.error(f"Skipping bad row: {e}")
+                stats["err"] += 1
+                continue
+            if SPLIT_CAPTIONS and caption.strip():
+                captions.append((
+                    len(documents),
+                    ReplaceOne({"_id": document["_id"]}, {"caption": caption}, upsert=True)
+                ))
+            documents.append(document)
+
+        if documents:
+            insert_documents(db_type, documents, captions, stats)
+
+    logger.info(f"[{db_type.upper()}] Imported {path} → {stats}")
+    return stats
@@ -1,11 +1,17 @@
 import logging
 import re
+import time
+import asyncio
+import threading
+import hashlib
 import base64
 from struct import pack
-from pymongo import MongoClient, TEXT
-from pymongo.errors import DuplicateKeyError
+from bson import Binary
+from pymongo import MongoClient, ReadPreference, ReplaceOne, UpdateOne, TEXT
+from pymongo.errors import DuplicateKeyError, BulkWriteError
 from hydrogram.file_id import FileId
 
+import info
 from info import (
     PRIMARY_DB_URL,
     CLOUD_DB_URL,
@@ -13,79 +19,566 @@ from info import (
     DATABASE_NAME,
     COLLECTION_NAME,
     USE_CAPTION_FILTER,
-    MAX_BTN
+    MAX_BTN,
+    INDEX_EXTENSIONS
 )
+from database.file_cache import FileMemo
+from database.query_log import QueryLog
 
 logger = logging.getLogger(__name__)
 
 # ─────────────────────────────────────
-# 🔌 DATABASE CONNECTIONS
+# ⚙️ OPTIONAL SETTINGS (info.py)
 # ─────────────────────────────────────
+# Missing from info.py → default below (= behaviour before the setting existed)
+FILE_ID_FORMAT = getattr(info, "FILE_ID_FORMAT", "string")          # "string" | "binary"
+SPLIT_CAPTIONS = getattr(info, "SPLIT_CAPTIONS", False)             # captions in side collection
+DB_TIERS = getattr(info, "DB_TIERS", [])                            # [] → PRIMARY/CLOUD/ARCHIVE_DB_URL
+TIER_HASH_ROUTING = getattr(info, "TIER_HASH_ROUTING", False)       # "auto" spreads by file id
+DB_CLIENT_OPTIONS = getattr(info, "DB_CLIENT_OPTIONS", {})          # MongoClient kwargs, all tiers
+DB_READ_PREFERENCE = getattr(info, "DB_READ_PREFERENCE", "primary")
+FILE_CACHE_TTL = getattr(info, "FILE_CACHE_TTL", 60)                # seconds
+FILE_CACHE_SIZE = getattr(info, "FILE_CACHE_SIZE", 1000)            # cached file details
+QUERY_LOG_SIZE_MB = getattr(info, "QUERY_LOG_SIZE_MB", 0)           # 0 → query log off
+QUERY_LOG_BATCH = getattr(info, "QUERY_LOG_BATCH", 100)
+QUERY_LOG_FLUSH_MS = getattr(info, "QUERY_LOG_FLUSH_MS", 2000)
+WARMUP_QUERIES = getattr(info, "WARMUP_QUERIES", 20)                # 0 → no warm-up
 
-# Primary DB
-primary_client = MongoClient(PRIMARY_DB_URL)
-primary_db = primary_client[DATABASE_NAME]
-primary_col = primary_db[COLLECTION_NAME]
+# ─────────────────────────────────────
+# 🔌 DATABASE TIERS (REGISTRY)
+# ─────────────────────────────────────
+# DB_TIERS (info.py) → list of dicts, one per cluster:
+#   {"name": "primary", "url": "...", "label": "🗂 Primary",
+#    "priority": 0, "role": "rw" | "r", "quota_mb": 512,
+#    "client_options": {"maxPoolSize": 50, "compressors": "zstd,zlib"},
+#    "read_preference": "secondaryPreferred"}
+# Empty → built from PRIMARY_DB_URL / CLOUD_DB_URL / ARCHIVE_DB_URL.
+#
+# client_options / read_preference default to DB_CLIENT_OPTIONS /
+# DB_READ_PREFERENCE. Writes (save_file, indexing, migrations) always go
+# to the primary node; search/count/facet/export reads use read_col.
+#
+# SPLIT_CAPTIONS → search collection keeps only short/searchable fields,
+# captions live in <COLLECTION_NAME>_captions of the same DB ({_id, caption})
+
+DEFAULT_TIERS = [
+    {"name": "primary", "url": PRIMARY_DB_URL, "label": "🗂 Primary", "priority": 0},
+    {"name": "cloud", "url": CLOUD_DB_URL, "label": "☁️ Cloud", "priority": 1},
+    {"name": "archive", "url": ARCHIVE_DB_URL, "label": "📦 Archive", "priority": 2},
+]
+
+AUTO_TIER = "auto"
+
+READ_PREFERENCES = {
+    "primary": ReadPreference.PRIMARY,
+    "primarypreferred": ReadPreference.PRIMARY_PREFERRED,
+    "secondary": ReadPreference.SECONDARY,
+    "secondarypreferred": ReadPreference.SECONDARY_PREFERRED,
+    "nearest": ReadPreference.NEAREST,
+}
+
+
+def get_read_preference(name: str | None):
+    mode = READ_PREFERENCES.get(str(name or "primary").lower())
+    if mode is None:
+        logger.warning(f"Unknown read preference {name!r}, using primary")
+        return ReadPreference.PRIMARY
+    return mode
+
+
+class Tier:
+    """
+    One Mongo cluster holding a slice of the file index
+    """
+    __slots__ = (
+        "name", "label", "url", "priority", "role", "quota_mb",
+        "client", "db", "col", "caption_col", "read_col", "read_caption_col"
+    )
+
+    def __init__(
+        self,
+        name,
+        url,
+        label=None,
+        priority=0,
+        role="rw",
+        quota_mb=0,
+        client_options=None,
+        read_preference=None
+    ):
+        self.name = name
+        self.label = label or name.title()
+        self.url = url
+        self.priority = int(priority)
+        self.role = role
+        self.quota_mb = float(quota_mb or 0)
+
+        # one pooled client per tier; per-tier keys override the defaults
+        options = {**(DB_CLIENT_OPTIONS or {}), **(client_options or {})}
+        self.client = MongoClient(url, **options)
+        self.db = self.client[DATABASE_NAME]
+        self.col = self.db[COLLECTION_NAME]
+        self.caption_col = self.db[f"{COLLECTION_NAME}_captions"]
+
+        read_pref = get_read_preference(read_preference or DB_READ_PREFERENCE)
+        self.read_col = self.col.with_options(read_preference=read_pref)
+        self.read_caption_col = self.caption_col.with_options(read_preference=read_pref)
+
+    @property
+    def writable(self) -> bool:
+        return "w" in self.role
 
-# Cloud DB
-cloud_col = None
-if CLOUD_DB_URL:
-    cloud_client = MongoClient(CLOUD_DB_URL)
-    cloud_db = cloud_client[DATABASE_NAME]
-    cloud_col = cloud_db[COLLECTION_NAME]
 
-# Archive DB
-archive_col = None
-if ARCHIVE_DB_URL:
-    archive_client = MongoClient(ARCHIVE_DB_URL)
-    archive_db = archive_client[DATABASE_NAME]
-    archive_col = archive_db[COLLECTION_NAME]
+def _load_tiers() -> dict:
+    tiers = [
+        Tier(**conf)
+        for conf in (DB_TIERS or DEFAULT_TIERS)
+        if conf.get("url")
+    ]
+    tiers.sort(key=lambda tier: tier.priority)
+    return {tier.name: tier for tier in tiers}
+
+
+TIERS = _load_tiers()
+
+# old names, kept for callers that still import them
+primary_col = TIERS["primary"].col if "primary" in TIERS else None
+cloud_col = TIERS["cloud"].col if "cloud" in TIERS else None
+archive_col = TIERS["archive"].col if "archive" in TIERS else None
 
 # ─────────────────────────────────────
-# 📌 CREATE TEXT INDEX (SAME FOR ALL)
+# 📌 CREATE INDEXES (SAME FOR ALL)
 # ─────────────────────────────────────
-for col in (primary_col, cloud_col, archive_col):
-    if col:
-        try:
-            col.create_index([("file_name", TEXT)])
-        except Exception as e:
-            logger.warning(f"Index creation skipped: {e}")
+# text index for file_name + compound indexes backing facet filters
+FACET_INDEXES = [
+    [("ext", 1), ("res", 1), ("file_size", 1)],
+    [("res", 1), ("year", 1)],
+    [("year", 1), ("file_size", 1)],
+    [("season", 1), ("episode", 1)],
+]
+
+for tier in TIERS.values():
+    try:
+        tier.col.create_index([("file_name", TEXT)])
+        for keys in FACET_INDEXES:
+            tier.col.create_index(keys)
+    except Exception as e:
+        logger.warning(f"[{tier.name.upper()}] Index creation skipped: {e}")
+
+# ─────────────────────────────────────
+# 📝 QUERY LOG (FIRST TIER, CAPPED)
+# ─────────────────────────────────────
+query_log = QueryLog(batch_size=QUERY_LOG_BATCH, flush_ms=QUERY_LOG_FLUSH_MS)
+
+if TIERS and QUERY_LOG_SIZE_MB:
+    query_log.bind(next(iter(TIERS.values())).db, "search_log", QUERY_LOG_SIZE_MB)
 
 # ─────────────────────────────────────
 # 🧠 HELPERS
 # ─────────────────────────────────────
 
+def get_tiers(writable: bool = False) -> list:
+    """
+    Tiers in priority order (writable=True → only rw tiers)
+    """
+    return [
+        tier for tier in TIERS.values()
+        if not writable or tier.writable
+    ]
+
+
+def tier_names() -> list:
+    return list(TIERS)
+
+
 def get_collection(db_type: str):
-    if db_type == "primary":
-        return primary_col
-    if db_type == "cloud":
-        return cloud_col
-    if db_type == "archive":
-        return archive_col
+    tier = TIERS.get(db_type)
+    return tier.col if tier else None
+
+
+def tier_is_writable(db_type: str) -> bool:
+    tier = TIERS.get(db_type)
+    return tier is not None and tier.writable
+
+
+def get_write_collection(db_type: str):
+    """
+    Search collection of a writable tier (None → unknown or read-only)
+    """
+    if not tier_is_writable(db_type):
+        logger.error(f"[{str(db_type).upper()}] Not a writable database")
+        return None
+    return TIERS[db_type].col
+
+
+def get_caption_collection(db_type: str):
+    tier = TIERS.get(db_type)
+    return tier.caption_col if tier else None
+
+
+def get_read_collection(db_type: str):
+    """
+    Search collection with the tier's read preference (may hit secondaries)
+    """
+    tier = TIERS.get(db_type)
+    return tier.read_col if tier else None
+
+
+def get_read_caption_collection(db_type: str):
+    tier = TIERS.get(db_type)
+    return tier.read_caption_col if tier else None
+
+
+_size_cache = {}
+SIZE_CACHE_SECONDS = 60
+
+
+def tier_db_size(db_type: str) -> int:
+    """
+    dbStats dataSize+indexSize in bytes (cached for a minute)
+    """
+    tier = TIERS.get(db_type)
+    if tier is None:
+        return 0
+
+    cached = _size_cache.get(db_type)
+    if cached and time.time() - cached[0] < SIZE_CACHE_SECONDS:
+        return cached[1]
+
+    try:
+        stats = tier.db.command("dbstats")
+        size = int(stats.get("dataSize", 0) + stats.get("indexSize", 0))
+    except Exception as e:
+        logger.warning(f"[{db_type.upper()}] dbstats failed: {e}")
+        size = cached[1] if cached else 0
+
+    _size_cache[db_type] = (time.time(), size)
+    return size
+
+
+_size_refreshing = set()
+
+
+def _refresh_size(db_type: str):
+    try:
+        tier_db_size(db_type)
+    finally:
+        _size_refreshing.discard(db_type)
+
+
+def tier_is_full(db_type: str) -> bool:
+    """
+    Never blocks: uses the cached size, a stale one is refreshed in the
+    background (unknown size → treated as not full)
+    """
+    tier = TIERS.get(db_type)
+    if tier is None or not tier.quota_mb:
+        return False
+
+    cached = _size_cache.get(db_type)
+    stale = not cached or time.time() - cached[0] >= SIZE_CACHE_SECONDS
+    if stale and db_type not in _size_refreshing:
+        _size_refreshing.add(db_type)
+        threading.Thread(
+            target=_refresh_size, args=(db_type,), name=f"dbstats-{db_type}", daemon=True
+        ).start()
+
+    return bool(cached) and cached[1] >= tier.quota_mb * 1024 * 1024
+
+
+def _rendezvous_score(tier_name: str, key: str) -> int:
+    return int.from_bytes(hashlib.md5(f"{tier_name}:{key}".encode()).digest()[:8], "big")
+
+
+def route_file_id(file_id) -> str | None:
+    """
+    Writable, non-full tier for a new _id
+    TIER_HASH_ROUTING → rendezvous hash over ALL writable tiers, so a tier
+    filling up or a new tier only moves the ids ranked highest there;
+    otherwise first tier by priority that still has room
+    """
+    tiers = get_tiers(writable=True)
+    if TIER_HASH_ROUTING:
+        # hash the string form → same tier before and after a binary _id migration
+        key = decode_file_id(file_id)
+        tiers.sort(key=lambda tier: _rendezvous_score(tier.name, key), reverse=True)
+
+    for tier in tiers:
+        if not tier_is_full(tier.name):
+            return tier.name
     return None
 
 
-def unpack_new_file_id(new_file_id: str) -> str:
+def find_existing_tier(file_id) -> str | None:
+    """
+    Tier already holding file_id under any _id form
+    (routing is not permanent → "auto" checks every tier before inserting)
+    """
+    keys = file_id_keys(decode_file_id(file_id))
+    for tier in get_tiers():
+        if tier.col.find_one({"_id": {"$in": keys}}, {"_id": 1}):
+            return tier.name
+    return None
+
+
+def existing_file_ids(file_ids: list) -> set:
+    """
+    String ids of file_ids already stored in any tier (one query per tier)
+    """
+    keys = [key for file_id in file_ids for key in file_id_keys(file_id)]
+    found = set()
+    for tier in get_tiers():
+        for doc in tier.col.find({"_id": {"$in": keys}}, {"_id": 1}):
+            found.add(decode_file_id(doc["_id"]))
+    return found
+
+
+def resolve_tier(db_type: str, file_id) -> str | None:
+    return route_file_id(file_id) if db_type == AUTO_TIER else db_type
+
+
+def pack_file_id(new_file_id: str) -> bytes:
     decoded = FileId.decode(new_file_id)
+    return pack(
+        "<iiqq",
+        int(decoded.file_type),
+        decoded.dc_id,
+        decoded.media_id,
+        decoded.access_hash
+    )
+
+
+def unpack_new_file_id(new_file_id: str) -> str:
     return base64.urlsafe_b64encode(
-        pack(
-            "<iiqq",
-            int(decoded.file_type),
-            decoded.dc_id,
-            decoded.media_id,
-            decoded.access_hash
-        )
+        pack_file_id(new_file_id)
     ).decode().rstrip("=")
 
 # ─────────────────────────────────────
-# 💾 SAVE FILE (PRIMARY / CLOUD / ARCHIVE)
+# 🗜 FILE ID CODEC (STRING ⇄ BINARY _id)
 # ─────────────────────────────────────
-async def save_file(media, db_type: str = "primary"):
-    collection = get_collection(db_type)
-    if not collection:
-        return "err"
+# FILE_ID_FORMAT = "binary" stores _id as the raw 24-byte <iiqq pack
+# instead of its ~32-char base64 string → smaller _id index.
+# Callers always see the base64 string form.
+
+FILE_ID_BINARY = str(FILE_ID_FORMAT).lower() == "binary"
+
+
+def _file_id_to_raw(file_id: str) -> bytes:
+    return base64.urlsafe_b64decode(file_id + "=" * (-len(file_id) % 4))
+
+
+def encode_file_id(file_id: str):
+    """
+    String file id → stored _id (per FILE_ID_FORMAT)
+    """
+    if FILE_ID_BINARY:
+        return Binary(_file_id_to_raw(file_id))
+    return file_id
+
+
+def decode_file_id(stored) -> str:
+    """
+    Stored _id (string or binary) → string file id
+    """
+    if isinstance(stored, bytes):
+        return base64.urlsafe_b64encode(bytes(stored)).decode().rstrip("=")
+    return stored
+
+
+def file_id_keys(file_id: str) -> list:
+    """
+    Every _id form a file may be stored under
+    (both during a partial migration)
+    """
+    keys = [file_id]
+    try:
+        keys.append(Binary(_file_id_to_raw(file_id)))
+    except (ValueError, TypeError):
+        pass
+    return keys
+
+# ─────────────────────────────────────
+# 🧠 FILE MEMO (COUNTS + DETAILS)
+# ─────────────────────────────────────
+# kept current across instances by change streams, TTL otherwise
+memo = FileMemo(ttl=FILE_CACHE_TTL, max_details=FILE_CACHE_SIZE, decode=decode_file_id)
+
+
+def watch_tiers():
+    for tier in TIERS.values():
+        memo.watch(tier.name, tier.col)
+
+# ─────────────────────────────────────
+# 🏷 FACETS (EXT / RES / YEAR / SEASON / EPISODE / SIZE)
+# ─────────────────────────────────────
+FACET_FIELDS = ("ext", "res", "year", "season", "episode")
+
+_EXTENSIONS = tuple(ext.lower().lstrip(".") for ext in INDEX_EXTENSIONS)
+_EXT_RE = re.compile(r"[.\s]([a-z0-9]{2,4})\s*$")
+_RES_RE = re.compile(r"(?<!\d)(2160|1440|1080|720|576|480|360)[pi](?![a-z0-9])", re.IGNORECASE)
+_4K_RE = re.compile(r"(?<![a-z0-9])(4k|uhd)(?![a-z0-9])", re.IGNORECASE)
+_YEAR_RE = re.compile(r"(?<!\d)(19[2-9]\d|20\d\d)(?![\dpi])", re.IGNORECASE)
+# apostrophes excluded → "Ocean's 8" / "Ocean's.11" are not seasons
+_SE_RE = re.compile(r"(?<![a-z0-9'’])s(\d{1,2})[\s._-]?e(\d{1,3})(?!\d)", re.IGNORECASE)
+_SEASON_RE = re.compile(
+    r"(?<![a-z0-9'’])(?:season[\s._-]?(\d{1,2})|s(\d{1,2}))(?!\d)", re.IGNORECASE
+)
+_SIZE_RE = re.compile(r"^size([<>])(\d+(?:\.\d+)?)(kb|mb|gb)?$", re.IGNORECASE)
+_SIZE_UNITS = {"kb": 1024, "mb": 1024 ** 2, "gb": 1024 ** 3}
+
+
+def normalize_resolution(value) -> str | None:
+    value = str(value).lower()
+    if value in ("4k", "uhd"):
+        return "2160p"
+    match = re.match(r"^(\d{3,4})[pi]?$", value)
+    return f"{match.group(1)}p" if match else None
+
+
+def extract_facets(file_name: str) -> dict:
+    """
+    Structured facets from a raw or cleaned file name
+    Only found facets are returned (absent → not stored)
+
+    >>> facets = extract_facets("Dark.S02E05.720p.mp4")
+    >>> facets["season"], facets["episode"]
+    (2, 5)
+    >>> extract_facets("The Office Season 3 480p.avi")["season"]
+    3
+    >>> extract_facets("Loki S01 2021 1080p.mkv")["season"]
+    1
+    >>> "season" in extract_facets("Ocean's 8 2018 1080p.mkv")
+    False
+    >>> "season" in extract_facets("Ocean's.11.2001.mkv")
+    False
+    >>> "season" in extract_facets("Schindlers List 1993.mkv")
+    False
+    >>> extract_facets("Blade.Runner.2049.2017.mkv")["year"]
+    2017
+    """
+    name = str(file_name or "")
+    facets = {}
+
+    match = _EXT_RE.search(name.lower())
+    if match and match.group(1) in _EXTENSIONS:
+        facets["ext"] = match.group(1)
+
+    match = _RES_RE.search(name)
+    if match:
+        facets["res"] = f"{match.group(1)}p"
+    elif _4K_RE.search(name):
+        facets["res"] = "2160p"
+
+    # last year-like token → titles with numbers ("Blade Runner 2049 2017")
+    years = _YEAR_RE.findall(name)
+    if years:
+        facets["year"] = int(years[-1])
 
-    file_id = unpack_new_file_id(media.file_id)
+    match = _SE_RE.search(name)
+    if match:
+        facets["season"] = int(match.group(1))
+        facets["episode"] = int(match.group(2))
+    else:
+        match = _SEASON_RE.search(name)
+        if match:
+            facets["season"] = int(match.group(1) or match.group(2))
+
+    return facets
+
+
+def parse_facet_query(text: str):
+    """
+    "Avatar res:1080p ext:mkv size<2GB" → ("Avatar", {...})
+    Tokens: ext: res: year: s:/season: e:/ep: size<N size>N (kb/mb/gb)
+    """
+    words = []
+    facets = {}
+
+    for token in str(text or "").split():
+        key, sep, value = token.partition(":")
+        key = key.lower()
+        size = _SIZE_RE.match(token)
+
+        if size:
+            amount = float(size.group(2)) * _SIZE_UNITS.get((size.group(3) or "mb").lower())
+            facets["max_size" if size.group(1) == "<" else "min_size"] = int(amount)
+        elif sep and key == "ext" and value:
+            facets["ext"] = value.lower().lstrip(".")
+        elif sep and key == "res" and normalize_resolution(value):
+            facets["res"] = normalize_resolution(value)
+        elif sep and key == "year" and value.isdigit():
+            facets["year"] = int(value)
+        elif sep and key in ("s", "season") and value.isdigit():
+            facets["season"] = int(value)
+        elif sep and key in ("e", "ep", "episode") and value.isdigit():
+            facets["episode"] = int(value)
+        else:
+            words.append(token)
+
+    return " ".join(words), facets
+
+
+def build_facet_filter(facets: dict | None) -> dict:
+    if not facets:
+        return {}
+
+    flt = {
+        field: facets[field]
+        for field in FACET_FIELDS
+        if facets.get(field) is not None
+    }
+
+    size = {}
+    if facets.get("min_size"):
+        size["$gte"] = facets["min_size"]
+    if facets.get("max_size"):
+        size["$lte"] = facets["max_size"]
+    if size:
+        flt["file_size"] = size
+
+    return flt
+
+
+def backfill_facets(db_type: str, batch_size: int = 1000) -> int:
+    """
+    Add facet fields to docs indexed before facets existed
+
+    Blocking – run with asyncio.to_thread from handlers
+    """
+    col = get_collection(db_type)
+    if col is None:
+        return 0
+
+    updated = 0
+    ops = []
+    for doc in col.find({}, {"file_name": 1}).batch_size(batch_size):
+        facets = extract_facets(doc.get("file_name"))
+        if facets:
+            ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": facets}))
+
+        if len(ops) >= batch_size:
+            col.bulk_write(ops, ordered=False)
+            updated += len(ops)
+            ops = []
+
+    if ops:
+        col.bulk_write(ops, ordered=False)
+        updated += len(ops)
+
+    memo.clear(db_type)
+    logger.info(f"[{db_type.upper()}] Facet backfill → {updated}")
+    return updated
+
+# ─────────────────────────────────────
+# 💾 SAVE FILE (PRIMARY / CLOUD / ARCHIVE)
+# ─────────────────────────────────────
+def build_file_document(media, db_type: str):
+    """
+    media → (search document, cleaned caption)
+    Shared by save_file and save_files
+    db_type "auto" is routed per _id (document["db"] = chosen tier)
+    """
+    file_id = encode_file_id(unpack_new_file_id(media.file_id))
     file_name = re.sub(r"@\w+|[_\-.+]", " ", str(media.file_name))
     caption = re.sub(r"@\w+|[_\-.+]", " ", str(media.caption or ""))
 
@@ -93,13 +586,41 @@ async def save_file(media, db_type: str = "primary"):
         "_id": file_id,
         "file_name": file_name,
         "file_size": media.file_size,
-        "caption": caption,
-        "db": db_type
+        "db": resolve_tier(db_type, file_id),
+        **extract_facets(media.file_name)
     }
+    if not SPLIT_CAPTIONS:
+        document["caption"] = caption
+
+    return document, caption
+
+
+async def save_file(media, db_type: str = "primary"):
+    document, caption = build_file_document(media, db_type)
+
+    # auto: an earlier run may have routed this file to another tier
+    if db_type == AUTO_TIER and find_existing_tier(document["_id"]):
+        return "dup"
+    db_type = document["db"]
+
+    collection = get_write_collection(db_type)
+    if collection is None:
+        return "err"
+
+    # binary mode: same file may still sit under its old string _id
+    if FILE_ID_BINARY and collection.find_one(
+        {"_id": decode_file_id(document["_id"])}, {"_id": 1}
+    ):
+        return "dup"
 
     try:
         collection.insert_one(document)
-        logger.info(f"[{db_type.upper()}] Indexed → {file_name}")
+        if SPLIT_CAPTIONS and caption.strip():
+            get_caption_collection(db_type).replace_one(
+                {"_id": document["_id"]}, {"caption": caption}, upsert=True
+            )
+        memo.local_write(db_type)
+        logger.info(f"[{db_type.upper()}] Indexed → {document['file_name']}")
         return "suc"
     except DuplicateKeyError:
         return "dup"
@@ -107,66 +628,649 @@ async def save_file(media, db_type: str = "primary"):
         logger.error(e)
         return "err"
 
+
+def insert_documents(db_type: str, documents: list, captions: list, stats: dict):
+    collection = get_write_collection(db_type)
+    if collection is None:
+        stats["err"] += len(documents)
+        return
+
+    # binary mode: skip files still stored under their old string _id
+    if FILE_ID_BINARY:
+        legacy = {
+            doc["_id"]
+            for doc in collection.find(
+                {"_id": {"$in": [decode_file_id(d["_id"]) for d in documents]}},
+                {"_id": 1}
+            )
+        }
+        if legacy:
+            keep = [
+                index for index, d in enumerate(documents)
+                if decode_file_id(d["_id"]) not in legacy
+            ]
+            stats["dup"] += len(documents) - len(keep)
+            remap = {old: new for new, old in enumerate(keep)}
+            documents = [documents[index] for index in keep]
+            captions = [
+                (remap[index], op) for index, op in captions if index in remap
+            ]
+            if not documents:
+                return
+
+    failed = set()
+    try:
+        collection.insert_many(documents, ordered=False)
+    except BulkWriteError as e:
+        for err in e.details.get("writeErrors", []):
+            failed.add(err["index"])
+            if err.get("code") == 11000:
+                stats["dup"] += 1
+            else:
+                logger.error(err.get("errmsg"))
+                stats["err"] += 1
+    except Exception as e:
+        logger.error(e)
+        stats["err"] += len(documents)
+        return
+
+    stats["suc"] += len(documents) - len(failed)
+    memo.local_write(db_type)
+
+    # only for docs that were actually inserted
+    captions = [op for index, op in captions if index not in failed]
+    if captions:
+        try:
+            get_caption_collection(db_type).bulk_write(captions, ordered=False)
+        except Exception as e:
+            logger.error(e)
+
+
+async def save_files(medias, db_type: str = "primary") -> dict:
+    """
+    Batched save_file, written off the event loop
+    Returns {"suc": n, "dup": n, "err": n}
+    """
+    return await asyncio.to_thread(write_files, medias, db_type)
+
+
+def write_files(medias, db_type: str = "primary") -> dict:
+    """
+    Blocking core of save_files: one insert_many (unordered) per tier
+    """
+    stats = {"suc": 0, "dup": 0, "err": 0}
+
+    built = []
+    for media in medias:
+        try:
+            built.append(build_file_document(media, db_type))
+        except Exception as e:
+            logger.error(e)
+            stats["err"] += 1
+
+    # auto: skip files an earlier run routed to any tier
+    if db_type == AUTO_TIER and built:
+        existing = existing_file_ids([decode_file_id(doc["_id"]) for doc, _ in built])
+        if existing:
+            fresh = [
+                (doc, caption) for doc, caption in built
+                if decode_file_id(doc["_id"]) not in existing
+            ]
+            stats["dup"] += len(built) - len(fresh)
+            built = fresh
+
+    # tier → (documents, [(index, caption op)])
+    batches = {}
+    for document, caption in built:
+        documents, captions = batches.setdefault(document["db"], ([], []))
+        if SPLIT_CAPTIONS and caption.strip():
+            captions.append((
+                len(documents),
+                ReplaceOne({"_id": document["_id"]}, {"caption": caption}, upsert=True)
+            ))
+        documents.append(document)
+
+    for name, (documents, captions) in batches.items():
+        insert_documents(name, documents, captions, stats)
+
+    if batches:
+        logger.info(f"[{str(db_type).upper()}] Batch indexed → {stats}")
+    return stats
+
+# ─────────────────────────────────────
+# 📇 COMPACT RESULT RECORD
+# ─────────────────────────────────────
+
+# Only the fields the result buttons need; caption stays on the server
+SEARCH_PROJECTION = {"_id": 1, "file_name": 1, "file_size": 1}
+
+
+class FileRecord:
+    """
+    Lightweight search hit (no caption, no per-hit dict)
+    Supports file["_id"] / file["file_name"] for old callers
+    """
+    __slots__ = ("file_id", "file_name", "file_size")
+
+    def __init__(self, file_id, file_name, file_size):
+        self.file_id = file_id
+        self.file_name = file_name
+        self.file_size = file_size
+
+    @classmethod
+    def from_doc(cls, doc):
+        return cls(
+            decode_file_id(doc["_id"]),
+            doc.get("file_name"),
+            doc.get("file_size")
+        )
+
+    def __getitem__(self, key):
+        if key == "_id":
+            return self.file_id
+        if key in ("file_name", "file_size"):
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __repr__(self):
+        return f"FileRecord({self.file_id!r}, {self.file_name!r}, {self.file_size!r})"
+
 # ─────────────────────────────────────
 # 🔍 SEARCH (ALL DBs or SINGLE DB)
 # ─────────────────────────────────────
-async def get_search_results(
+def _search_pattern(query: str):
+    query = query.strip()
+    if not query:
+        return re.compile(".", re.IGNORECASE)
+    return re.compile(query.replace(" ", ".*"), re.IGNORECASE)
+
+
+def build_search_filter(
+    query: str,
+    db_type: str | None = None,
+    facets: dict | None = None
+) -> dict:
+    """
+    Plain find() filter on the search collection
+    (inline captions only – see search_pipeline for split captions)
+    """
+    return {
+        **_text_filter(query),
+        **build_facet_filter(facets)
+    }
+
+
+def _text_filter(query: str) -> dict:
+    pattern = _search_pattern(query)
+
+    if not USE_CAPTION_FILTER:
+        return {"file_name": pattern}
+    return {"$or": [{"file_name": pattern}, {"caption": pattern}]}
+
+
+def _joins_captions() -> bool:
+    return bool(USE_CAPTION_FILTER and SPLIT_CAPTIONS)
+
+
+def search_pipeline(query: str, facets: dict | None = None) -> list:
+    """
+    Aggregation stages yielding matching search docs
+
+    Split captions are joined on the server: $unionWith pulls docs whose
+    side-collection caption matches, $group drops the double hits.
+    Nothing is materialised client-side (needs MongoDB 4.4+).
+    """
+    flt = build_search_filter(query, facets=facets)
+    if not _joins_captions():
+        return [{"$match": flt}]
+
+    facet_flt = build_facet_filter(facets)
+    return [
+        {"$match": flt},
+        {"$unionWith": {
+            "coll": f"{COLLECTION_NAME}_captions",
+            "pipeline": [
+                {"$match": {"caption": _search_pattern(query)}},
+                {"$lookup": {
+                    "from": COLLECTION_NAME,
+                    "localField": "_id",
+                    "foreignField": "_id",
+                    "as": "doc"
+                }},
+                {"$unwind": "$doc"},
+                {"$replaceRoot": {"newRoot": "$doc"}},
+                *([{"$match": facet_flt}] if facet_flt else [])
+            ]
+        }},
+        {"$group": {"_id": "$_id", "doc": {"$first": "$$ROOT"}}},
+        {"$replaceRoot": {"newRoot": "$doc"}}
+    ]
+
+
+def count_matches(col, query: str, facets: dict | None = None) -> int:
+    if not _joins_captions():
+        return col.count_documents(build_search_filter(query, facets=facets))
+
+    pipeline = search_pipeline(query, facets) + [{"$count": "n"}]
+    return next(col.aggregate(pipeline, allowDiskUse=True), {}).get("n", 0)
+
+
+def find_matches(
+    col,
+    query: str,
+    facets: dict | None = None,
+    projection: dict | None = None,
+    skip: int = 0,
+    limit: int | None = None,
+    batch_size: int | None = None
+):
+    """
+    Matching docs in _id order → stable pages across queries / replica members
+    limit=None → all matches (streamed)
+    """
+    if not _joins_captions():
+        cursor = col.find(build_search_filter(query, facets=facets), projection).sort("_id", 1)
+        if skip:
+            cursor = cursor.skip(skip)
+        if limit:
+            cursor = cursor.limit(limit)
+        if batch_size:
+            cursor = cursor.batch_size(batch_size)
+        return cursor
+
+    pipeline = search_pipeline(query, facets) + [{"$sort": {"_id": 1}}]
+    if skip:
+        pipeline.append({"$skip": skip})
+    if limit:
+        pipeline.append({"$limit": limit})
+    if projection:
+        pipeline.append({"$project": projection})
+    options = {"allowDiskUse": True}
+    if batch_size:
+        options["batchSize"] = batch_size
+    return col.aggregate(pipeline, **options)
+
+
+def search_page(
+    col,
+    query: str,
+    facets: dict | None = None,
+    projection: dict | None = None,
+    skip: int = 0,
+    limit: int = MAX_BTN
+):
+    """
+    (total matches, docs of one page)
+    Split captions → count and page come from ONE join aggregation
+    instead of running the $unionWith/$lookup/$group twice
+    """
+    if not _joins_captions():
+        count = count_matches(col, query, facets)
+        if skip >= count:
+            return count, []
+        return count, list(find_matches(col, query, facets, projection, skip=skip, limit=limit))
+
+    page = [{"$sort": {"_id": 1}}]
+    if skip:
+        page.append({"$skip": skip})
+    page.append({"$limit": limit})
+    if projection:
+        page.append({"$project": projection})
+
+    pipeline = search_pipeline(query, facets) + [
+        {"$facet": {"total": [{"$count": "n"}], "page": page}}
+    ]
+    result = next(col.aggregate(pipeline, allowDiskUse=True), {})
+    total = result.get("total") or [{}]
+    return total[0].get("n", 0), result.get("page", [])
+
+
+def _search_collections(db_type: str | None):
+    db_types = [db_type] if db_type else tier_names()
+    return [
+        (name, get_read_collection(name))
+        for name in db_types
+        if get_read_collection(name) is not None
+    ]
+
+
+def search_files(
     query: str,
     db_type: str | None = None,
     max_results: int = MAX_BTN,
-    offset: int = 0
+    offset: int = 0,
+    compact: bool = True,
+    facets: dict | None = None
 ):
-    query = query.strip()
-    if not query:
-        pattern = re.compile(".", re.IGNORECASE)
-    else:
-        pattern = re.compile(query.replace(" ", ".*"), re.IGNORECASE)
+    """
+    Blocking search core (run it via asyncio.to_thread off the loop)
+    compact=True  → FileRecord hits (_id, file_name, file_size only)
+    compact=False → full documents (use get_file_details for single files)
+    facets        → ext / res / year / season / episode / min_size / max_size
+    """
+    projection = SEARCH_PROJECTION if compact else None
 
-    if USE_CAPTION_FILTER:
-        flt = {"$or": [{"file_name": pattern}, {"caption": pattern}]}
-    else:
-        flt = {"file_name": pattern}
+    files = []
+    total = 0
+    skip = offset
 
-    results = []
+    # Count per DB, then only fetch the slice that lands on this page
+    for name, col in _search_collections(db_type):
+        need = max_results - len(files)
+        if need <= 0:
+            total += count_matches(col, query, facets)
+            continue
 
-    collections = (
-        [get_collection(db_type)]
-        if db_type
-        else [primary_col, cloud_col, archive_col]
-    )
+        count, docs = search_page(col, query, facets, projection, skip=skip, limit=need)
+        total += count
+        if skip >= count:
+            skip -= count
+            continue
 
-    for col in collections:
-        if col:
-            results.extend(list(col.find(flt)))
+        if compact:
+            files.extend(FileRecord.from_doc(doc) for doc in docs)
+        else:
+            for doc in docs:
+                doc["_id"] = decode_file_id(doc["_id"])
+                files.append(doc)
+        skip = 0
 
-    total = len(results)
-    files = results[offset: offset + max_results]
     next_offset = offset + max_results if offset + max_results < total else ""
+    return files, next_offset, total
+
+
+async def get_search_results(
+    query: str,
+    db_type: str | None = None,
+    max_results: int = MAX_BTN,
+    offset: int = 0,
+    compact: bool = True,
+    facets: dict | None = None,
+    log: bool = True
+):
+    """
+    search_files (in a worker thread) + query log
+    log=False → not written to the query log
+    """
+    started = time.perf_counter()
+    files, next_offset, total = await asyncio.to_thread(
+        search_files, query, db_type, max_results, offset, compact, facets
+    )
+
+    if log and offset == 0:
+        query_log.record(
+            query,
+            tier=db_type or "all",
+            hits=len(files),
+            total=total,
+            latency_ms=(time.perf_counter() - started) * 1000
+        )
 
     return files, next_offset, total
 
+
+async def warm_up_search(top_n: int = WARMUP_QUERIES) -> int:
+    """
+    Replay the most popular logged queries so Mongo's working set
+    (indexes + matching docs) is hot before users arrive
+    Replays run in a worker thread and are not logged
+    """
+    if not top_n:
+        return 0
+
+    try:
+        rows = await asyncio.to_thread(query_log.top_queries, top_n)
+    except Exception as e:
+        logger.warning(f"Search warm-up skipped: {e}")
+        return 0
+
+    for row in rows:
+        try:
+            await asyncio.to_thread(search_files, row["_id"])
+        except Exception as e:
+            logger.warning(f"Warm-up query {row['_id']!r} failed: {e}")
+
+    logger.info(f"Search warm-up replayed {len(rows)} queries")
+    return len(rows)
+
+# ─────────────────────────────────────
+# 🛠 ADMIN SEARCH (SINGLE DB)
+# ─────────────────────────────────────
+async def admin_search_count(keyword: str, db_type: str, facets: dict | None = None) -> int:
+    col = get_read_collection(db_type)
+    if col is None:
+        return 0
+    return await asyncio.to_thread(count_matches, col, keyword, facets)
+
+
+async def admin_search_results(
+    keyword: str,
+    db_type: str,
+    offset: int = 0,
+    limit: int = MAX_BTN,
+    facets: dict | None = None
+):
+    col = get_read_collection(db_type)
+    if col is None:
+        return [], offset, 0
+
+    total, docs = await asyncio.to_thread(
+        search_page, col, keyword, facets, SEARCH_PROJECTION, skip=offset, limit=limit
+    )
+    files = [FileRecord.from_doc(doc) for doc in docs]
+
+    return files, offset + limit, total
+
+async def facet_counts(
+    keyword: str,
+    db_type: str,
+    facets: dict | None = None,
+    limit: int = 5
+) -> dict:
+    """
+    Top values per facet for a query → {"res": [("1080p", 12), ...], ...}
+    """
+    col = get_read_collection(db_type)
+    if col is None:
+        return {}
+
+    pipeline = search_pipeline(keyword, facets) + [
+        {"$facet": {
+            field: [
+                {"$match": {field: {"$exists": True}}},
+                {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+                {"$sort": {"count": -1}},
+                {"$limit": limit}
+            ]
+            for field in ("ext", "res", "year")
+        }}
+    ]
+
+    result = await asyncio.to_thread(
+        lambda: next(col.aggregate(pipeline, allowDiskUse=True), {})
+    )
+    return {
+        field: [(row["_id"], row["count"]) for row in rows]
+        for field, rows in result.items()
+    }
+
 # ─────────────────────────────────────
 # 📊 COUNTS (STATS PANEL)
 # ─────────────────────────────────────
 def count_files(db_type: str) -> int:
-    col = get_collection(db_type)
-    return col.count_documents({}) if col else 0
+    col = get_read_collection(db_type)
+    if col is None:
+        return 0
+
+    watch_tiers()
+    count = memo.get_count(db_type)
+    if count is None:
+        token = memo.count_token(db_type)
+        count = col.count_documents({})
+        memo.set_count(db_type, count, token)
+    return count
 
 
 def count_all_files() -> int:
-    return (
-        count_files("primary")
-        + count_files("cloud")
-        + count_files("archive")
-    )
+    return sum(count_files(name) for name in tier_names())
 
 # ─────────────────────────────────────
 # 📦 FILE DETAILS (PM / STREAM)
 # ─────────────────────────────────────
 async def get_file_details(file_id: str):
-    for col in (primary_col, cloud_col, archive_col):
-        if col:
-            doc = col.find_one({"_id": file_id})
-            if doc:
-                return doc
+    watch_tiers()
+    cached = memo.get_details(file_id)
+    if cached:
+        return cached
+
+    keys = file_id_keys(file_id)
+    for tier in get_tiers():
+        db_type, col = tier.name, tier.col
+        doc = col.find_one({"_id": {"$in": keys}})
+        if doc:
+            if "caption" not in doc:
+                side = get_caption_collection(db_type).find_one({"_id": doc["_id"]})
+                doc["caption"] = side["caption"] if side else ""
+            doc["_id"] = decode_file_id(doc["_id"])
+            memo.set_details(file_id, db_type, doc)
+            return doc
     return None
+
+# ─────────────────────────────────────
+# 🔁 MIGRATE STRING _id → BINARY _id
+# ─────────────────────────────────────
+def migrate_file_ids(db_type: str, batch_size: int = 1000, progress=None) -> dict:
+    """
+    Rewrite string _id docs of one DB as binary _id, batch by batch
+    (_id is immutable → insert new copy, then delete old)
+
+    Blocking – run with asyncio.to_thread from handlers
+    progress(stats) is called after every batch
+
+    Only with FILE_ID_FORMAT="binary": in string mode save_file keeps
+    inserting string _ids next to the migrated copies
+    """
+    if not FILE_ID_BINARY:
+        raise RuntimeError('FILE_ID_FORMAT is not "binary"')
+    col = get_collection(db_type)
+    if col is None:
+        raise ValueError(f"Unknown database {db_type!r}")
+    stats = {"migrated": 0, "duplicate": 0, "invalid": 0}
+
+    last_id = ""
+    while True:
+        batch = list(
+            col.find({"_id": {"$type": "string", "$gt": last_id}})
+            .sort("_id", 1)
+            .limit(batch_size)
+        )
+        if not batch:
+            break
+        last_id = batch[-1]["_id"]
+
+        old_ids = []
+        new_docs = []
+        for doc in batch:
+            try:
+                raw = _file_id_to_raw(doc["_id"])
+            except (ValueError, TypeError):
+                stats["invalid"] += 1
+                continue
+            if len(raw) != 24:
+                stats["invalid"] += 1
+                continue
+            old_ids.append(doc["_id"])
+            doc["_id"] = Binary(raw)
+            new_docs.append(doc)
+
+        if not new_docs:
+            continue
+
+        inserted = len(new_docs)
+        try:
+            col.insert_many(new_docs, ordered=False)
+        except BulkWriteError as e:
+            # already migrated copies are fine, anything else is not
+            errors = e.details.get("writeErrors", [])
+            if any(err.get("code") != 11000 for err in errors):
+                raise
+            inserted -= len(errors)
+            stats["duplicate"] += len(errors)
+
+        col.delete_many({"_id": {"$in": old_ids}})
+        stats["migrated"] += inserted
+
+        # split captions are keyed by the same _id → move them too
+        caption_col = get_caption_collection(db_type)
+        captions = list(caption_col.find({"_id": {"$in": old_ids}}))
+        if captions:
+            caption_col.bulk_write([
+                ReplaceOne(
+                    {"_id": Binary(_file_id_to_raw(doc["_id"]))},
+                    {"caption": doc["caption"]},
+                    upsert=True
+                )
+                for doc in captions
+            ], ordered=False)
+            caption_col.delete_many({"_id": {"$in": [doc["_id"] for doc in captions]}})
+
+        if progress:
+            progress(stats)
+
+    memo.clear(db_type)
+    logger.info(f"[{db_type.upper()}] _id migration → {stats}")
+    return stats
+
+# ─────────────────────────────────────
+# ✂️ MOVE CAPTIONS → SIDE COLLECTION
+# ─────────────────────────────────────
+def split_captions(db_type: str, batch_size: int = 1000) -> dict:
+    """
+    Move inline captions of one DB into its caption collection
+    (empty captions are just dropped)
+
+    Blocking – run with asyncio.to_thread from handlers
+
+    Only with SPLIT_CAPTIONS on: otherwise searches never join the side
+    collection and moved captions stop matching
+    """
+    if not SPLIT_CAPTIONS:
+        raise RuntimeError("SPLIT_CAPTIONS is off")
+    col = get_collection(db_type)
+    caption_col = get_caption_collection(db_type)
+    if col is None:
+        raise ValueError(f"Unknown database {db_type!r}")
+    stats = {"moved": 0, "dropped": 0}
+
+    while True:
+        batch = list(
+            col.find({"caption": {"$exists": True}}, {"caption": 1})
+            .limit(batch_size)
+        )
+        if not batch:
+            break
+
+        ops = [
+            ReplaceOne({"_id": doc["_id"]}, {"caption": doc["caption"]}, upsert=True)
+            for doc in batch
+            if str(doc.get("caption") or "").strip()
+        ]
+        if ops:
+            caption_col.bulk_write(ops, ordered=False)
+
+        col.update_many(
+            {"_id": {"$in": [doc["_id"] for doc in batch]}},
+            {"$unset": {"caption": ""}}
+        )
+        stats["moved"] += len(ops)
+        stats["dropped"] += len(batch) - len(ops)
+
+    memo.clear(db_type)
+    logger.info(f"[{db_type.upper()}] caption split → {stats}")
+    return stats
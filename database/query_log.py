@@ -0,0 +1,120 @@
+import re
+import asyncio
+import logging
+from datetime import datetime, timezone
+
+from pymongo.errors import CollectionInvalid, PyMongoError
+
+logger = logging.getLogger(__name__)
+
+# ─────────────────────────────────────
+# 📝 SEARCH QUERY LOG (CAPPED, BATCHED)
+# ─────────────────────────────────────
+# {q, tier, hits, total, latency_ms, ts} per search, buffered in memory
+# and written with one insert_many every `batch_size` entries or
+# `flush_ms` after the first buffered one. The capped collection keeps
+# the newest entries only → bounded size, no cleanup job.
+
+
+def normalize_query(query: str) -> str:
+    return re.sub(r"\s+", " ", str(query or "")).strip().lower()
+
+
+class QueryLog:
+
+    def __init__(self, batch_size: int = 100, flush_ms: int = 2000):
+        self.batch_size = max(int(batch_size), 1)
+        self.flush_delay = max(int(flush_ms), 0) / 1000
+        self.collection = None
+        self.buffer = []
+        self.timer = None
+        self.tasks = set()
+
+    def bind(self, db, name: str, size_mb: float):
+        """
+        Use (and create if missing) a capped collection of db
+        """
+        try:
+            db.create_collection(name, capped=True, size=int(size_mb * 1024 * 1024))
+        except CollectionInvalid:
+            pass    # already exists
+        except PyMongoError as e:
+            logger.warning(f"Query log disabled: {e}")
+            return
+
+        self.collection = db[name]
+        try:
+            self.collection.create_index([("q", 1)])
+            self.collection.create_index([("total", 1), ("q", 1)])
+        except PyMongoError as e:
+            logger.warning(f"Query log index creation skipped: {e}")
+
+    # ── write path ──
+    def record(self, query: str, tier: str, hits: int, total: int, latency_ms: float):
+        """
+        Non-blocking; must be called from inside the running loop
+        """
+        if self.collection is None:
+            return
+
+        self.buffer.append({
+            "q": normalize_query(query),
+            "tier": tier,
+            "hits": hits,
+            "total": total,
+            "latency_ms": round(latency_ms, 2),
+            "ts": datetime.now(timezone.utc)
+        })
+
+        if len(self.buffer) >= self.batch_size:
+            self._spawn(self.flush())
+        elif self.timer is None:
+            self.timer = self._spawn(self._flush_later())
+
+    def _spawn(self, coro):
+        task = asyncio.get_running_loop().create_task(coro)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        return task
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_delay)
+        self.timer = None
+        await self.flush()
+
+    async def flush(self):
+        if self.timer:
+            self.timer.cancel()
+            self.timer = None
+
+        batch, self.buffer = self.buffer, []
+        if not batch or self.collection is None:
+            return
+
+        try:
+            await asyncio.to_thread(self.collection.insert_many, batch, ordered=False)
+        except PyMongoError as e:
+            logger.warning(f"Query log flush failed: {e}")
+
+    # ── analytics ──
+    def _grouped(self, match: dict, limit: int) -> list:
+        if self.collection is None:
+            return []
+        pipeline = [
+            {"$match": {"q": {"$ne": ""}, **match}},
+            {"$group": {
+                "_id": "$q",
+                "count": {"$sum": 1},
+                "latency_ms": {"$avg": "$latency_ms"},
+                "total": {"$max": "$total"}
+            }},
+            {"$sort": {"count": -1}},
+            {"$limit": limit}
+        ]
+        return list(self.collection.aggregate(pipeline))
+
+    def top_queries(self, limit: int = 10) -> list:
+        return self._grouped({}, limit)
+
+    def zero_result_queries(self, limit: int = 10) -> list:
+        return self._grouped({"total": 0}, limit)
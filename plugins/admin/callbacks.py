@@ -1,13 +1,15 @@
 # plugins/admin/callbacks.py
 import time
+import asyncio
 from hydrogram import Client, filters, enums
 from hydrogram.types import InlineKeyboardMarkup, InlineKeyboardButton, CallbackQuery
 
 from info import ADMINS, TOTAL_DB_SIZE_MB
 from utils import get_readable_time, temp
 from database.ia_filterdb import (
-    db_count_documents,
-    second_db_count_documents,
+    count_files,
+    get_tiers,
+    tier_db_size,
 )
 from database.users_chats_db import db
 
@@ -82,45 +84,41 @@ async def admin_stats(client, query: CallbackQuery):
     users = await db.total_users_count()
     chats = await db.total_chat_count()
 
-    primary_files = db_count_documents()
-    cloud_files = second_db_count_documents()
-
-    # archive (safe fallback)
-    try:
-        from database.ia_filterdb import archive_db_count_documents
-        archive_files = archive_db_count_documents()
-    except Exception:
-        archive_files = 0
-
-    total_files = primary_files + cloud_files + archive_files
-
-    # DB SIZE (MB)
-    used_bytes = (
-        await db.get_files_db_size() +
-        await db.get_second_files_db_size()
+    tiers = get_tiers()
+    # blocking pymongo calls → worker threads, all tiers at once
+    counts = await asyncio.gather(
+        *(asyncio.to_thread(count_files, tier.name) for tier in tiers)
     )
+    sizes = await asyncio.gather(
+        *(asyncio.to_thread(tier_db_size, tier.name) for tier in tiers)
+    )
+    tier_files = list(zip(tiers, counts))
+    total_files = sum(counts)
 
-    try:
-        used_bytes += await db.get_archive_files_db_size()
-    except Exception:
-        pass
+    # DB SIZE (MB)
+    used_bytes = sum(sizes)
 
     used_mb = used_bytes / (1024 * 1024)
-    total_mb = TOTAL_DB_SIZE_MB
+    # quota tiers count their quota, the rest share TOTAL_DB_SIZE_MB (as before tiers)
+    total_mb = sum(tier.quota_mb for tier in tiers)
+    if not tiers or any(not tier.quota_mb for tier in tiers):
+        total_mb += TOTAL_DB_SIZE_MB
 
     bar = db_progress_bar(used_mb, total_mb)
     percent = round((used_mb / total_mb) * 100, 2)
 
     uptime = get_readable_time(time.time() - temp.START_TIME)
+    tier_lines = "".join(
+        f"{tier.label}  : <code>{files}</code>\n"
+        for tier, files in tier_files
+    )
 
     text = (
         "<b>📊 Bot Statistics</b>\n\n"
         f"👤 Users : <code>{users}</code>\n"
         f"👥 Chats : <code>{chats}</code>\n\n"
 
-        f"🗂 Primary  : <code>{primary_files}</code>\n"
-        f"☁️ Cloud    : <code>{cloud_files}</code>\n"
-        f"📦 Archive  : <code>{archive_files}</code>\n\n"
+        f"{tier_lines}\n"
 
         f"📊 Total Files : <code>{total_files}</code>\n\n"
 
@@ -176,23 +174,22 @@ async def admin_broadcast(client, query: CallbackQuery):
 # ─────────────────────────────────────
 @Client.on_callback_query(filters.regex("^admin_databases$") & admin_filter)
 async def admin_databases(client, query: CallbackQuery):
+    tiers = get_tiers()
+
     text = (
         "<b>🧠 Database Manager</b>\n\n"
         "Select database 👇\n\n"
-        "• Primary DB\n"
-        "• Cloud DB\n"
-        "• Archive DB"
+        + "\n".join(f"• {tier.label} DB" for tier in tiers)
     )
 
-    buttons = [
-        [
-            InlineKeyboardButton("🗂 Primary", callback_data="db_primary"),
-            InlineKeyboardButton("☁️ Cloud", callback_data="db_cloud"),
-        ],
-        [InlineKeyboardButton("📦 Archive", callback_data="db_archive")],
-        [InlineKeyboardButton("« Back", callback_data="admin_home")]
+    db_buttons = [
+        InlineKeyboardButton(tier.label, callback_data=f"db_{tier.name}")
+        for tier in tiers
     ]
 
+    buttons = [db_buttons[i:i + 2] for i in range(0, len(db_buttons), 2)]
+    buttons.append([InlineKeyboardButton("« Back", callback_data="admin_home")])
+
     await query.edit_message_text(
         text,
         reply_markup=InlineKeyboardMarkup(buttons),
@@ -0,0 +1,137 @@
+# plugins/admin/export.py
+import os
+import time
+import asyncio
+import tempfile
+
+from hydrogram import Client, filters, enums
+
+from info import ADMINS
+from utils import get_readable_time
+from database.ia_filterdb import parse_facet_query, tier_names, tier_is_writable
+from database.file_transfer import export_files, import_files, EXPORT_FORMATS
+
+
+# ─────────────────────────────────────
+# 🔐 ADMIN FILTER
+# ─────────────────────────────────────
+async def admin_only(_, __, obj):
+    return obj.from_user and obj.from_user.id in ADMINS
+
+admin_filter = filters.create(admin_only)
+
+transfer_lock = asyncio.Lock()
+
+
+# ─────────────────────────────────────
+# 📤 EXPORT (TIER / ALL / QUERY)
+# ─────────────────────────────────────
+@Client.on_message(filters.command("export") & filters.private & admin_filter)
+async def admin_export(bot, message):
+    """
+    /export <db|all> [jsonl|csv] [query...]
+    """
+    if len(message.command) < 2:
+        return await message.reply(
+            f"Usage: <code>/export {'|'.join(tier_names())}|all [jsonl|csv] [query]</code>",
+            parse_mode=enums.ParseMode.HTML
+        )
+
+    db_type = message.command[1].lower()
+    args = message.command[2:]
+    fmt = "jsonl"
+    if args and args[0].lower() in EXPORT_FORMATS:
+        fmt = args.pop(0).lower()
+    query, facets = parse_facet_query(" ".join(args))
+
+    if db_type != "all" and db_type not in tier_names():
+        return await message.reply("❌ Unknown database.")
+
+    if transfer_lock.locked():
+        return await message.reply("⏳ Export/import already running. Please wait.")
+
+    start_time = time.time()
+    status = await message.reply("⏳ Exporting...")
+
+    name = f"{db_type}_{int(start_time)}.{fmt}.gz"
+    path = os.path.join(tempfile.gettempdir(), name)
+
+    async with transfer_lock:
+        try:
+            rows = await asyncio.to_thread(
+                export_files,
+                path,
+                None if db_type == "all" else db_type,
+                query,
+                facets,
+                fmt
+            )
+            await message.reply_document(
+                path,
+                caption=(
+                    "<b>📤 Export Completed</b>\n\n"
+                    f"🗄 Database : <code>{db_type.upper()}</code>\n"
+                    f"🔎 Query : <code>{query or '-'}</code>\n"
+                    f"📁 Files : <code>{rows}</code>\n"
+                    f"⏱ Time : <code>{get_readable_time(time.time() - start_time)}</code>"
+                ),
+                parse_mode=enums.ParseMode.HTML
+            )
+        except Exception as e:
+            return await status.edit(f"❌ Export failed: {e}")
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
+
+    await status.delete()
+
+
+# ─────────────────────────────────────
+# 📥 IMPORT (REPLY TO EXPORT FILE)
+# ─────────────────────────────────────
+@Client.on_message(filters.command("import") & filters.private & admin_filter)
+async def admin_import(bot, message):
+    """
+    /import <db>  (reply to a .jsonl(.gz) / .csv(.gz) export)
+    """
+    reply = message.reply_to_message
+    if len(message.command) < 2 or not reply or not reply.document:
+        return await message.reply(
+            f"Usage: reply to an export file with <code>/import {'|'.join(tier_names())}</code>",
+            parse_mode=enums.ParseMode.HTML
+        )
+
+    db_type = message.command[1].lower()
+    if db_type not in tier_names():
+        return await message.reply("❌ Unknown database.")
+    if not tier_is_writable(db_type):
+        return await message.reply("❌ Database is read-only.")
+
+    if transfer_lock.locked():
+        return await message.reply("⏳ Export/import already running. Please wait.")
+
+    start_time = time.time()
+    status = await message.reply("⏳ Importing...")
+
+    async with transfer_lock:
+        path = None
+        try:
+            path = await reply.download(
+                file_name=os.path.join(tempfile.gettempdir(), reply.document.file_name)
+            )
+            stats = await asyncio.to_thread(import_files, path, db_type)
+        except Exception as e:
+            return await status.edit(f"❌ Import failed: {e}")
+        finally:
+            if path and os.path.exists(path):
+                os.remove(path)
+
+    await status.edit(
+        "<b>📥 Import Completed</b>\n\n"
+        f"🗄 Database : <code>{db_type.upper()}</code>\n"
+        f"📥 Saved : <code>{stats['suc']}</code>\n"
+        f"♻️ Duplicate : <code>{stats['dup']}</code>\n"
+        f"❌ Errors : <code>{stats['err']}</code>\n\n"
+        f"⏱ Time Taken : <code>{get_readable_time(time.time() - start_time)}</code>",
+        parse_mode=enums.ParseMode.HTML
+    )
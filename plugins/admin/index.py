@@ -12,7 +12,7 @@ from hydrogram.types import (
 
 from info import ADMINS, INDEX_EXTENSIONS
 from utils import temp, get_readable_time
-from database.ia_filterdb import save_file
+from database.ia_filterdb import save_file, get_tiers, AUTO_TIER, TIER_HASH_ROUTING
 
 
 # ─────────────────────────────────────
@@ -80,27 +80,25 @@ async def admin_index_start(bot, message):
         "Choose where to index 👇"
     )
 
-    buttons = [
-        [
-            InlineKeyboardButton(
-                "🗂 Primary DB",
-                callback_data=f"index_db#primary#{chat_id}#{last_msg_id}#{skip}"
-            ),
-            InlineKeyboardButton(
-                "☁️ Cloud DB",
-                callback_data=f"index_db#cloud#{chat_id}#{last_msg_id}#{skip}"
-            ),
-        ],
-        [
+    db_buttons = [
+        InlineKeyboardButton(
+            f"{tier.label} DB",
+            callback_data=f"index_db#{tier.name}#{chat_id}#{last_msg_id}#{skip}"
+        )
+        for tier in get_tiers(writable=True)
+    ]
+    if TIER_HASH_ROUTING:
+        db_buttons.append(
             InlineKeyboardButton(
-                "📦 Archive DB",
-                callback_data=f"index_db#archive#{chat_id}#{last_msg_id}#{skip}"
+                "🔀 Auto (hash)",
+                callback_data=f"index_db#{AUTO_TIER}#{chat_id}#{last_msg_id}#{skip}"
             )
-        ],
-        [
-            InlineKeyboardButton("❌ Cancel", callback_data="index_cancel")
-        ]
-    ]
+        )
+
+    buttons = [db_buttons[i:i + 2] for i in range(0, len(db_buttons), 2)]
+    buttons.append([
+        InlineKeyboardButton("❌ Cancel", callback_data="index_cancel")
+    ])
 
     await message.reply(
         text,
@@ -146,6 +144,37 @@ async def index_with_db(bot, query: CallbackQuery):
     )
 
 
+# ─────────────────────────────────────
+# 🎞 MEDIA CHECK (MANUAL + LIVE INDEX)
+# ─────────────────────────────────────
+def get_index_media(message):
+    """
+    Returns (media, None) if indexable
+    else (None, "deleted" | "no_media" | "unsupported")
+    """
+    if message.empty:
+        return None, "deleted"
+
+    if not message.media:
+        return None, "no_media"
+
+    if message.media not in (
+        enums.MessageMediaType.VIDEO,
+        enums.MessageMediaType.DOCUMENT
+    ):
+        return None, "unsupported"
+
+    media = getattr(message, message.media.value, None)
+    if not media or not media.file_name:
+        return None, "unsupported"
+
+    if not str(media.file_name).lower().endswith(tuple(INDEX_EXTENSIONS)):
+        return None, "unsupported"
+
+    media.caption = message.caption
+    return media, None
+
+
 # ─────────────────────────────────────
 # ⚙️ CORE INDEX LOGIC
 # ─────────────────────────────────────
@@ -164,31 +193,17 @@ async def run_indexing(bot, msg, chat_id, last_msg_id, skip, db_type):
 
                 current += 1
 
-                if message.empty:
+                media, skip_reason = get_index_media(message)
+                if skip_reason == "deleted":
                     deleted += 1
                     continue
-
-                if not message.media:
+                if skip_reason == "no_media":
                     no_media += 1
                     continue
-
-                if message.media not in (
-                    enums.MessageMediaType.VIDEO,
-                    enums.MessageMediaType.DOCUMENT
-                ):
-                    unsupported += 1
-                    continue
-
-                media = getattr(message, message.media.value, None)
-                if not media or not media.file_name:
-                    unsupported += 1
-                    continue
-
-                if not str(media.file_name).lower().endswith(tuple(INDEX_EXTENSIONS)):
+                if skip_reason:
                     unsupported += 1
                     continue
 
-                media.caption = message.caption
                 status = await save_file(media, db_type=db_type)
 
                 if status == "suc":
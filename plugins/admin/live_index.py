@@ -0,0 +1,112 @@
+# plugins/admin/live_index.py
+import atexit
+import asyncio
+import logging
+
+from hydrogram import Client, filters
+
+import info
+from database.ia_filterdb import save_files, write_files, tier_is_writable, AUTO_TIER
+from plugins.admin.index import get_index_media
+
+logger = logging.getLogger(__name__)
+
+# optional (info.py); no channels → live indexing off
+LIVE_INDEX_CHANNELS = getattr(info, "LIVE_INDEX_CHANNELS", [])
+LIVE_INDEX_DB = getattr(info, "LIVE_INDEX_DB", "primary")
+LIVE_INDEX_BATCH = getattr(info, "LIVE_INDEX_BATCH", 50)
+LIVE_INDEX_FLUSH_MS = getattr(info, "LIVE_INDEX_FLUSH_MS", 1000)
+
+
+# ─────────────────────────────────────
+# 📦 MICRO-BATCHER
+# ─────────────────────────────────────
+class LiveIndexer:
+    """
+    Buffers new channel medias and saves them with one insert_many
+    Flush: every `batch_size` medias or `flush_ms` after the first one
+    """
+
+    def __init__(self, db_type: str, batch_size: int, flush_ms: int):
+        self.db_type = db_type
+        self.batch_size = max(int(batch_size), 1)
+        self.flush_delay = max(int(flush_ms), 0) / 1000
+        self.buffer = []
+        self.timer = None
+        self.lock = asyncio.Lock()
+        self.stats = {"suc": 0, "dup": 0, "err": 0}
+
+    async def add(self, media):
+        self.buffer.append(media)
+
+        if len(self.buffer) >= self.batch_size:
+            await self.flush()
+        elif self.timer is None:
+            self.timer = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_delay)
+        self.timer = None
+        await self.flush()
+
+    async def flush(self):
+        if self.timer:
+            self.timer.cancel()
+            self.timer = None
+
+        # swap before awaiting → new medias go to the next batch
+        batch, self.buffer = self.buffer, []
+        if not batch:
+            return
+
+        async with self.lock:
+            try:
+                result = await save_files(batch, db_type=self.db_type)
+            except Exception as e:
+                logger.error(f"Live index flush failed: {e}")
+                self.stats["err"] += len(batch)
+                return
+
+        self._report(len(batch), result)
+
+    def flush_sync(self):
+        """
+        Shutdown path (atexit): write whatever is still buffered
+        """
+        batch, self.buffer = self.buffer, []
+        if not batch:
+            return
+        try:
+            self._report(len(batch), write_files(batch, db_type=self.db_type))
+        except Exception as e:
+            logger.error(f"Live index shutdown flush failed: {e}")
+
+    def _report(self, size, result):
+        for key, value in result.items():
+            self.stats[key] += value
+        logger.info(
+            f"[LIVE → {self.db_type.upper()}] flushed {size} · "
+            f"saved {result['suc']} · dup {result['dup']} · err {result['err']} "
+            f"(total saved {self.stats['suc']}, dup {self.stats['dup']}, err {self.stats['err']})"
+        )
+
+
+if LIVE_INDEX_CHANNELS and LIVE_INDEX_DB != AUTO_TIER and not tier_is_writable(LIVE_INDEX_DB):
+    logger.error(f"LIVE_INDEX_DB {LIVE_INDEX_DB!r} is not a writable database, live posts will fail")
+
+live_indexer = LiveIndexer(LIVE_INDEX_DB, LIVE_INDEX_BATCH, LIVE_INDEX_FLUSH_MS)
+atexit.register(live_indexer.flush_sync)
+
+
+# ─────────────────────────────────────
+# 📡 NEW CHANNEL POSTS
+# ─────────────────────────────────────
+@Client.on_message(
+    filters.chat(LIVE_INDEX_CHANNELS) & (filters.document | filters.video),
+    group=1
+)
+async def live_index_post(bot, message):
+    media, skip_reason = get_index_media(message)
+    if skip_reason:
+        return
+    await live_indexer.add(media)
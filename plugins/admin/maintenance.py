@@ -0,0 +1,178 @@
+# plugins/admin/maintenance.py
+import time
+import asyncio
+
+from hydrogram import Client, filters, enums
+
+from info import ADMINS
+from utils import get_readable_time
+from database.ia_filterdb import (
+    migrate_file_ids,
+    split_captions,
+    backfill_facets,
+    tier_names,
+    FILE_ID_BINARY,
+    SPLIT_CAPTIONS
+)
+
+
+# ─────────────────────────────────────
+# 🔐 ADMIN FILTER
+# ─────────────────────────────────────
+async def admin_only(_, __, obj):
+    return obj.from_user and obj.from_user.id in ADMINS
+
+admin_filter = filters.create(admin_only)
+
+migrate_lock = asyncio.Lock()
+
+
+# ─────────────────────────────────────
+# 🗜 MIGRATE _id → BINARY
+# ─────────────────────────────────────
+@Client.on_message(filters.command("migrate_ids") & filters.private & admin_filter)
+async def admin_migrate_ids(bot, message):
+    """
+    /migrate_ids <db> [batch_size]
+    """
+    if len(message.command) < 2:
+        return await message.reply(
+            f"Usage: <code>/migrate_ids {'|'.join(tier_names())} [batch_size]</code>",
+            parse_mode=enums.ParseMode.HTML
+        )
+
+    db_type = message.command[1].lower()
+    if db_type not in tier_names():
+        return await message.reply(f"❌ Unknown database: {db_type}")
+    try:
+        batch_size = int(message.command[2]) if len(message.command) > 2 else 1000
+    except ValueError:
+        return await message.reply("❌ Batch size must be a number.")
+
+    # string mode would keep inserting string _ids beside the migrated ones
+    if not FILE_ID_BINARY:
+        return await message.reply(
+            "❌ Set <code>FILE_ID_FORMAT = \"binary\"</code> in info.py and restart first.",
+            parse_mode=enums.ParseMode.HTML
+        )
+
+    if migrate_lock.locked():
+        return await message.reply("⏳ Migration already running. Please wait.")
+
+    start_time = time.time()
+    status = await message.reply(
+        "<b>🗜 _id Migration Started</b>\n\n"
+        f"🗄 Database : <code>{db_type.upper()}</code>\n"
+        f"📦 Batch : <code>{batch_size}</code>",
+        parse_mode=enums.ParseMode.HTML
+    )
+
+    async with migrate_lock:
+        try:
+            stats = await asyncio.to_thread(migrate_file_ids, db_type, batch_size)
+        except Exception as e:
+            return await status.edit(f"❌ Migration failed: {e}")
+
+    await status.edit(
+        "<b>✅ _id Migration Completed</b>\n\n"
+        f"🗄 Database : <code>{db_type.upper()}</code>\n"
+        f"📥 Migrated : <code>{stats['migrated']}</code>\n"
+        f"♻️ Duplicate : <code>{stats['duplicate']}</code>\n"
+        f"🚫 Invalid : <code>{stats['invalid']}</code>\n\n"
+        f"⏱ Time Taken : <code>{get_readable_time(time.time() - start_time)}</code>",
+        parse_mode=enums.ParseMode.HTML
+    )
+
+
+# ─────────────────────────────────────
+# ✂️ SPLIT CAPTIONS → SIDE COLLECTION
+# ─────────────────────────────────────
+@Client.on_message(filters.command("split_captions") & filters.private & admin_filter)
+async def admin_split_captions(bot, message):
+    """
+    /split_captions <db>
+    """
+    if len(message.command) < 2:
+        return await message.reply(
+            f"Usage: <code>/split_captions {'|'.join(tier_names())}</code>",
+            parse_mode=enums.ParseMode.HTML
+        )
+
+    db_type = message.command[1].lower()
+    if db_type not in tier_names():
+        return await message.reply(f"❌ Unknown database: {db_type}")
+
+    # searches only join the side collection with SPLIT_CAPTIONS on
+    if not SPLIT_CAPTIONS:
+        return await message.reply(
+            "❌ Set <code>SPLIT_CAPTIONS = True</code> in info.py and restart first.",
+            parse_mode=enums.ParseMode.HTML
+        )
+
+    if migrate_lock.locked():
+        return await message.reply("⏳ Migration already running. Please wait.")
+
+    start_time = time.time()
+    status = await message.reply(
+        "<b>✂️ Caption Split Started</b>\n\n"
+        f"🗄 Database : <code>{db_type.upper()}</code>",
+        parse_mode=enums.ParseMode.HTML
+    )
+
+    async with migrate_lock:
+        try:
+            stats = await asyncio.to_thread(split_captions, db_type)
+        except Exception as e:
+            return await status.edit(f"❌ Caption split failed: {e}")
+
+    await status.edit(
+        "<b>✅ Caption Split Completed</b>\n\n"
+        f"🗄 Database : <code>{db_type.upper()}</code>\n"
+        f"📤 Moved : <code>{stats['moved']}</code>\n"
+        f"🗑 Empty Dropped : <code>{stats['dropped']}</code>\n\n"
+        f"⏱ Time Taken : <code>{get_readable_time(time.time() - start_time)}</code>",
+        parse_mode=enums.ParseMode.HTML
+    )
+
+
+# ─────────────────────────────────────
+# 🏷 BACKFILL FACETS
+# ─────────────────────────────────────
+@Client.on_message(filters.command("backfill_facets") & filters.private & admin_filter)
+async def admin_backfill_facets(bot, message):
+    """
+    /backfill_facets <db>
+    """
+    if len(message.command) < 2:
+        return await message.reply(
+            f"Usage: <code>/backfill_facets {'|'.join(tier_names())}</code>",
+            parse_mode=enums.ParseMode.HTML
+        )
+
+    db_type = message.command[1].lower()
+    if db_type not in tier_names():
+        return await message.reply(f"❌ Unknown database: {db_type}")
+
+    if migrate_lock.locked():
+        return await message.reply("⏳ Migration already running. Please wait.")
+
+    start_time = time.time()
+    status = await message.reply(
+        "<b>🏷 Facet Backfill Started</b>\n\n"
+        f"🗄 Database : <code>{db_type.upper()}</code>",
+        parse_mode=enums.ParseMode.HTML
+    )
+
+    async with migrate_lock:
+        try:
+            updated = await asyncio.to_thread(backfill_facets, db_type)
+        except Exception as e:
+            return await status.edit(f"❌ Facet backfill failed: {e}")
+
+    await status.edit(
+        "<b>✅ Facet Backfill Completed</b>\n\n"
+        f"🗄 Database : <code>{db_type.upper()}</code>\n"
+        f"🏷 Updated : <code>{updated}</code>\n\n"
+        f"⏱ Time Taken : <code>{get_readable_time(time.time() - start_time)}</code>",
+        parse_mode=enums.ParseMode.HTML
+    )
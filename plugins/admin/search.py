@@ -1,4 +1,7 @@
 # plugins/admin/search.py
+import html
+import zlib
+import asyncio
 
 from hydrogram import Client, filters, enums
 from hydrogram.types import (
@@ -11,8 +14,14 @@ from info import ADMINS, MAX_BTN
 from utils import temp
 from database.ia_filterdb import (
     admin_search_count,
-    admin_search_results
+    admin_search_results,
+    facet_counts,
+    parse_facet_query,
+    get_tiers,
+    query_log,
+    warm_up_search
 )
+from plugins.admin.watchdog import call_when_loop_runs
 
 
 # ─────────────────────────────────────
@@ -24,6 +33,23 @@ async def admin_only(_, __, obj):
 admin_filter = filters.create(admin_only)
 
 
+# ─────────────────────────────────────
+# 🔑 SEARCH KEYS (CALLBACK DATA ≤ 64 BYTES)
+# ─────────────────────────────────────
+# facet tokens make keywords long → buttons carry a short key instead
+SEARCH_KEYS = {}            # crc32 hex → keyword
+MAX_SEARCH_KEYS = 1000
+
+
+def search_key(keyword: str) -> str:
+    key = f"{zlib.crc32(keyword.encode()):08x}"
+    SEARCH_KEYS.pop(key, None)
+    SEARCH_KEYS[key] = keyword
+    while len(SEARCH_KEYS) > MAX_SEARCH_KEYS:
+        SEARCH_KEYS.pop(next(iter(SEARCH_KEYS)))
+    return key
+
+
 # ─────────────────────────────────────
 # 🔍 ADMIN SEARCH ENTRY
 # ─────────────────────────────────────
@@ -32,9 +58,11 @@ async def admin_search_entry(client, query: CallbackQuery):
     await query.edit_message_text(
         "<b>🔍 Admin Search</b>\n\n"
         "Send your search keyword in chat.\n"
-        "Example: <code>Avatar 2022</code>",
+        "Example: <code>Avatar 2022</code>\n\n"
+        "Filters: <code>ext:mkv res:1080p year:2022 s:1 e:3 size&lt;2GB size&gt;500MB</code>",
         parse_mode=enums.ParseMode.HTML,
         reply_markup=InlineKeyboardMarkup([
+            [InlineKeyboardButton("📈 Top Queries", callback_data="admin_top_queries")],
             [InlineKeyboardButton("« Back", callback_data="admin_home")]
         ])
     )
@@ -51,44 +79,41 @@ async def admin_search_entry(client, query: CallbackQuery):
 # 📊 GROUPED SEARCH RESULT
 # ─────────────────────────────────────
 async def show_grouped_results(client, query, keyword):
-    primary = await admin_search_count(keyword, db_type="primary")
-    cloud = await admin_search_count(keyword, db_type="cloud")
-    archive = await admin_search_count(keyword, db_type="archive")
+    text_query, facets = parse_facet_query(keyword)
+    tiers = get_tiers()
+    # counted in worker threads, all tiers at once
+    counts = list(zip(tiers, await asyncio.gather(*(
+        admin_search_count(text_query, db_type=tier.name, facets=facets)
+        for tier in tiers
+    ))))
 
-    total = primary + cloud + archive
+    total = sum(count for _, count in counts)
 
     text = (
         "<b>📊 Search Results</b>\n\n"
-        f"🔎 Query : <code>{keyword}</code>\n\n"
-        f"🗂 Primary : <code>{primary}</code>\n"
-        f"☁️ Cloud : <code>{cloud}</code>\n"
-        f"📦 Archive : <code>{archive}</code>\n\n"
-        f"📁 Total Files : <code>{total}</code>\n\n"
+        f"🔎 Query : <code>{html.escape(keyword)}</code>\n\n"
+    )
+    for tier, count in counts:
+        text += f"{tier.label} : <code>{count}</code>\n"
+    text += (
+        f"\n📁 Total Files : <code>{total}</code>\n\n"
         "Select database 👇"
     )
 
-    buttons = [
-        [
-            InlineKeyboardButton(
-                f"🗂 Primary ({primary})",
-                callback_data=f"admin_search_db#primary#0#{keyword}"
-            ),
-            InlineKeyboardButton(
-                f"☁️ Cloud ({cloud})",
-                callback_data=f"admin_search_db#cloud#0#{keyword}"
-            )
-        ],
-        [
-            InlineKeyboardButton(
-                f"📦 Archive ({archive})",
-                callback_data=f"admin_search_db#archive#0#{keyword}"
-            )
-        ],
-        [
-            InlineKeyboardButton("« Back", callback_data="admin_home")
-        ]
+    key = search_key(keyword)
+    db_buttons = [
+        InlineKeyboardButton(
+            f"{tier.label} ({count})",
+            callback_data=f"admin_search_db#{tier.name}#0#{key}"
+        )
+        for tier, count in counts
     ]
 
+    buttons = [db_buttons[i:i + 2] for i in range(0, len(db_buttons), 2)]
+    buttons.append([
+        InlineKeyboardButton("« Back", callback_data="admin_home")
+    ])
+
     await query.edit_message_text(
         text,
         reply_markup=InlineKeyboardMarkup(buttons),
@@ -101,36 +126,57 @@ async def show_grouped_results(client, query, keyword):
 # ─────────────────────────────────────
 @Client.on_callback_query(filters.regex("^admin_search_db#") & admin_filter)
 async def admin_search_db(client, query: CallbackQuery):
-    _, db_type, offset, keyword = query.data.split("#")
+    _, db_type, offset, key = query.data.split("#")
     offset = int(offset)
+    keyword = SEARCH_KEYS.get(key)
+    if keyword is None:
+        return await query.answer("Search expired, please search again", show_alert=True)
+    text_query, facets = parse_facet_query(keyword)
 
-    files, next_offset, total = await admin_search_results(
-        keyword=keyword,
+    results = admin_search_results(
+        keyword=text_query,
         db_type=db_type,
         offset=offset,
-        limit=MAX_BTN
+        limit=MAX_BTN,
+        facets=facets
     )
+    # facet breakdown on the first page only, fetched alongside the page
+    if offset == 0:
+        (files, next_offset, total), breakdown = await asyncio.gather(
+            results, facet_counts(text_query, db_type, facets)
+        )
+    else:
+        files, next_offset, total = await results
+        breakdown = {}
 
     if not files:
         return await query.answer("No more results", show_alert=True)
 
     text = (
         f"<b>📂 {db_type.upper()} Results</b>\n\n"
-        f"🔎 Query : <code>{keyword}</code>\n"
-        f"📁 Total : <code>{total}</code>\n\n"
+        f"🔎 Query : <code>{html.escape(keyword)}</code>\n"
+        f"📁 Total : <code>{total}</code>\n"
     )
 
+    for field, rows in breakdown.items():
+        if rows:
+            text += f"🏷 {field} : " + " · ".join(
+                f"{value} ({count})" for value, count in rows
+            ) + "\n"
+
+    text += "\n"
+
     buttons = []
 
     for file in files:
-        text += f"• {file['file_name']}\n"
+        text += f"• {html.escape(str(file['file_name']))}\n"
 
     # pagination
     if next_offset < total:
         buttons.append([
             InlineKeyboardButton(
                 "➡️ Next",
-                callback_data=f"admin_search_db#{db_type}#{next_offset}#{keyword}"
+                callback_data=f"admin_search_db#{db_type}#{next_offset}#{key}"
             )
         ])
 
@@ -143,3 +189,68 @@ async def admin_search_db(client, query: CallbackQuery):
         reply_markup=InlineKeyboardMarkup(buttons),
         parse_mode=enums.ParseMode.HTML
     )
+
+
+# ─────────────────────────────────────
+# 🔥 SEARCH WARM-UP
+# ─────────────────────────────────────
+warmup_task = None
+
+
+def start_warm_up() -> bool:
+    """
+    Replay popular searches in the background (one run at a time)
+    False → a warm-up is already running
+    """
+    global warmup_task
+    if warmup_task and not warmup_task.done():
+        return False
+    warmup_task = asyncio.get_running_loop().create_task(warm_up_search())
+    return True
+
+
+# warm Mongo up as soon as the bot starts, not on the first admin /start
+call_when_loop_runs(start_warm_up)
+
+
+# ─────────────────────────────────────
+# 📈 TOP / ZERO-RESULT QUERIES
+# ─────────────────────────────────────
+@Client.on_callback_query(filters.regex("^admin_top_queries(#warmup)?$") & admin_filter)
+async def admin_top_queries(client, query: CallbackQuery):
+    if query.data.endswith("#warmup"):
+        if start_warm_up():
+            await query.answer("🔥 Warm-up started")
+        else:
+            await query.answer("🔥 Warm-up already running")
+
+    await query_log.flush()
+    top = await asyncio.to_thread(query_log.top_queries, 10)
+    zero = await asyncio.to_thread(query_log.zero_result_queries, 10)
+
+    text = "<b>📈 Top Queries</b>\n\n"
+    if not top:
+        text += "No searches logged yet\n"
+    for row in top:
+        text += (
+            f"• <code>{html.escape(row['_id'])}</code> — {row['count']}× · "
+            f"{row['total']} files · {row['latency_ms']:.0f}ms\n"
+        )
+
+    text += "\n<b>🚫 Zero-Result Queries</b>\n\n"
+    if not zero:
+        text += "None 🎉\n"
+    for row in zero:
+        text += f"• <code>{html.escape(row['_id'])}</code> — {row['count']}×\n"
+
+    await query.edit_message_text(
+        text,
+        parse_mode=enums.ParseMode.HTML,
+        reply_markup=InlineKeyboardMarkup([
+            [
+                InlineKeyboardButton("🔄 Refresh", callback_data="admin_top_queries"),
+                InlineKeyboardButton("🔥 Warm Up", callback_data="admin_top_queries#warmup"),
+            ],
+            [InlineKeyboardButton("« Back", callback_data="admin_search")]
+        ])
+    )
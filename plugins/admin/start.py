@@ -40,6 +40,9 @@ async def admin_start(client, message):
         [
             InlineKeyboardButton("📢 Broadcast", callback_data="admin_broadcast"),
             InlineKeyboardButton("⚙️ Settings", callback_data="admin_settings"),
+        ],
+        [
+            InlineKeyboardButton("🐢 Loop Lag", callback_data="admin_loop_lag"),
         ]
     ]
 
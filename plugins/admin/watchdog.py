@@ -0,0 +1,224 @@
+# plugins/admin/watchdog.py
+import os
+import sys
+import time
+import asyncio
+import logging
+import threading
+import traceback
+from collections import deque
+
+from hydrogram import Client, filters, enums
+from hydrogram.types import InlineKeyboardMarkup, InlineKeyboardButton, CallbackQuery
+
+import info
+from info import ADMINS
+
+logger = logging.getLogger(__name__)
+
+# optional (info.py)
+LOOP_LAG_THRESHOLD_MS = getattr(info, "LOOP_LAG_THRESHOLD_MS", 100)
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+# ─────────────────────────────────────
+# 🐢 EVENT-LOOP LAG WATCHDOG
+# ─────────────────────────────────────
+class LoopWatchdog:
+    """
+    Ticker coroutine measures how late the loop wakes up
+    Watchdog thread snapshots the loop thread's stack while it is stuck
+    → stalls are charged to the innermost bot frame (e.g. get_search_results)
+    """
+
+    def __init__(self, threshold: float = 0.1, interval: float = 0.05, keep: int = 500):
+        self.threshold = threshold
+        self.interval = interval
+
+        self.lags = deque(maxlen=keep)
+        self.offenders = {}         # "file:function" → {"count", "total", "max", "stack"}
+        self.pending = {}           # tick stamp → (key, stack) captured mid-stall
+        self.lock = threading.Lock()
+
+        self.last_tick = 0.0
+        self.loop_thread_id = None
+        self.ticker = None
+        self.thread = None
+
+    def start(self):
+        """
+        Idempotent; must be called from inside the running loop
+        """
+        if self.ticker and not self.ticker.done():
+            return
+        self.loop_thread_id = threading.get_ident()
+        self.last_tick = time.monotonic()
+        self.ticker = asyncio.get_running_loop().create_task(self._tick())
+
+        if not self.thread:
+            self.thread = threading.Thread(
+                target=self._watch, name="loop-watchdog", daemon=True
+            )
+            self.thread.start()
+        logger.info(f"Loop watchdog started ({self.threshold * 1000:.0f}ms threshold)")
+
+    async def _tick(self):
+        while True:
+            tick = self.last_tick
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(now - tick - self.interval, 0)
+            self.last_tick = now
+            self.lags.append(lag)
+            if lag >= self.threshold:
+                self._charge(tick, lag)
+
+    def _watch(self):
+        while True:
+            time.sleep(self.interval / 2)
+            tick = self.last_tick
+            if time.monotonic() - tick - self.interval < self.threshold:
+                continue
+            with self.lock:
+                if tick in self.pending:
+                    continue
+            frame = sys._current_frames().get(self.loop_thread_id)
+            if frame is None:
+                continue
+            stack = traceback.extract_stack(frame)
+            with self.lock:
+                self.pending[tick] = (blame_frame(stack), stack)
+
+    def _charge(self, tick, lag):
+        with self.lock:
+            key, stack = self.pending.pop(tick, ("unknown (stall shorter than sample)", None))
+            self.pending.clear()
+            entry = self.offenders.setdefault(
+                key, {"count": 0, "total": 0.0, "max": 0.0, "stack": None}
+            )
+            entry["count"] += 1
+            entry["total"] += lag
+            entry["max"] = max(entry["max"], lag)
+            if stack:
+                entry["stack"] = stack
+
+        logger.warning(
+            f"Event loop blocked {lag * 1000:.0f}ms in {key}"
+            + ("\n" + "".join(traceback.format_list(stack[-8:])) if stack else "")
+        )
+
+    def top(self, limit: int = 10):
+        with self.lock:
+            items = sorted(
+                self.offenders.items(), key=lambda item: item[1]["total"], reverse=True
+            )
+        return items[:limit]
+
+    def lag_summary(self) -> dict:
+        lags = sorted(self.lags)
+        if not lags:
+            return {"samples": 0, "p50": 0.0, "p95": 0.0, "max": 0.0}
+        return {
+            "samples": len(lags),
+            "p50": lags[len(lags) // 2],
+            "p95": lags[min(int(len(lags) * 0.95), len(lags) - 1)],
+            "max": lags[-1],
+        }
+
+    def reset(self):
+        with self.lock:
+            self.offenders.clear()
+            self.pending.clear()
+        self.lags.clear()
+
+
+def blame_frame(stack) -> str:
+    """
+    Innermost frame from bot code (not stdlib / site-packages)
+    """
+    for frame in reversed(stack):
+        path = os.path.abspath(frame.filename)
+        if (
+            path.startswith(ROOT_DIR)
+            and "site-packages" not in path
+            and path != os.path.abspath(__file__)
+        ):
+            return f"{os.path.relpath(path, ROOT_DIR)}:{frame.name}"
+    last = stack[-1] if stack else None
+    return f"{os.path.basename(last.filename)}:{last.name}" if last else "unknown"
+
+
+def call_when_loop_runs(callback) -> bool:
+    """
+    Schedule callback on the running event loop
+    (plugins are imported by Client.start() inside the bot's loop)
+    No running loop → nothing scheduled, the caller must start it itself
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        logger.warning(
+            f"No running event loop at import, {callback.__qualname__} not started "
+            "(call it from inside the loop)"
+        )
+        return False
+    loop.call_soon(callback)
+    return True
+
+
+watchdog = LoopWatchdog(threshold=LOOP_LAG_THRESHOLD_MS / 1000)
+
+# sample from startup on, not from the first admin interaction
+call_when_loop_runs(watchdog.start)
+
+
+# ─────────────────────────────────────
+# 🔐 ADMIN FILTER
+# ─────────────────────────────────────
+async def admin_only(_, __, obj):
+    return obj.from_user and obj.from_user.id in ADMINS
+
+admin_filter = filters.create(admin_only)
+
+
+# ─────────────────────────────────────
+# 🐢 LOOP LAG PANEL
+# ─────────────────────────────────────
+@Client.on_callback_query(filters.regex("^admin_loop_lag(#reset)?$") & admin_filter)
+async def admin_loop_lag(client, query: CallbackQuery):
+    watchdog.start()
+    if query.data.endswith("#reset"):
+        watchdog.reset()
+
+    lag = watchdog.lag_summary()
+    text = (
+        "<b>🐢 Event Loop Lag</b>\n\n"
+        f"📏 Threshold : <code>{watchdog.threshold * 1000:.0f}ms</code>\n"
+        f"🔢 Samples : <code>{lag['samples']}</code>\n"
+        f"📊 p50 / p95 : <code>{lag['p50'] * 1000:.1f}ms / {lag['p95'] * 1000:.1f}ms</code>\n"
+        f"🔺 Max : <code>{lag['max'] * 1000:.1f}ms</code>\n\n"
+        "<b>Top blockers</b>\n"
+    )
+
+    offenders = watchdog.top()
+    if not offenders:
+        text += "✅ No stalls recorded"
+    for key, entry in offenders:
+        text += (
+            f"• <code>{key}</code>\n"
+            f"   {entry['count']}× · total {entry['total'] * 1000:.0f}ms"
+            f" · max {entry['max'] * 1000:.0f}ms\n"
+        )
+
+    await query.edit_message_text(
+        text,
+        parse_mode=enums.ParseMode.HTML,
+        reply_markup=InlineKeyboardMarkup([
+            [
+                InlineKeyboardButton("🔄 Refresh", callback_data="admin_loop_lag"),
+                InlineKeyboardButton("🧹 Reset", callback_data="admin_loop_lag#reset"),
+            ],
+            [InlineKeyboardButton("« Back", callback_data="admin_home")]
+        ])
+    )
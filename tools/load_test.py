@@ -0,0 +1,268 @@
+# tools/load_test.py
+"""
+Load generator for the admin handlers
+
+Drives the plugin coroutines directly with stub Client / Message /
+CallbackQuery objects, against whatever Mongo info.py points at
+(use a local one!), and reports:
+  • end-to-end handler latency (p50 / p95 / p99 / max)
+  • event-loop lag (how late a 10ms ticker wakes up)
+  • throughput (handler calls per second)
+
+Usage:
+    python -m tools.load_test --concurrency 200 --requests 2000
+    python -m tools.load_test --scenarios search,stats --keyword avatar
+    python -m tools.load_test --scenarios index --index-messages 500
+
+The index scenario writes synthetic files tagged with a per-run id and
+deletes them (and their split captions) when the run ends.
+"""
+import time
+import uuid
+import random
+import asyncio
+import argparse
+import statistics
+
+from hydrogram import enums
+from hydrogram.file_id import FileId, FileType
+
+from info import ADMINS
+from utils import temp
+from plugins.admin.search import admin_search_db, search_key
+from plugins.admin.callbacks import admin_stats, admin_home
+from plugins.admin.index import index_with_db
+from plugins.admin.watchdog import watchdog
+from database.ia_filterdb import tier_names, get_tiers
+
+LAG_TICK = 0.01
+RUN_ID = uuid.uuid4().hex[:12]
+
+
+# ─────────────────────────────────────
+# 🎭 STUB HYDROGRAM OBJECTS
+# ─────────────────────────────────────
+class FakeUser:
+    def __init__(self, user_id):
+        self.id = user_id
+        self.mention = f"<a href='tg://user?id={user_id}'>admin</a>"
+
+
+class FakeMessage:
+    """
+    Accepts every outgoing call the admin handlers make, records nothing
+    """
+
+    def __init__(self, chat_id, user, text=""):
+        self.id = random.randint(1, 1 << 30)
+        self.chat = type("Chat", (), {"id": chat_id})()
+        self.from_user = user
+        self.text = text
+
+    async def edit(self, *args, **kwargs):
+        return self
+
+    edit_text = edit
+
+    async def reply(self, *args, **kwargs):
+        return FakeMessage(self.chat.id, self.from_user)
+
+    reply_text = reply
+
+    async def delete(self, *args, **kwargs):
+        return True
+
+
+class FakeCallbackQuery:
+    def __init__(self, data, user):
+        self.data = data
+        self.from_user = user
+        self.message = FakeMessage(user.id, user)
+
+    async def edit_message_text(self, *args, **kwargs):
+        return self.message
+
+    async def answer(self, *args, **kwargs):
+        return True
+
+
+class FakeDocument:
+    def __init__(self, index):
+        self.file_id = FileId(
+            file_type=FileType.DOCUMENT,
+            dc_id=4,
+            media_id=random.getrandbits(62),
+            access_hash=random.getrandbits(62),
+            file_reference=b""
+        ).encode()
+        self.file_name = f"zz.loadtest.{RUN_ID}.{index}.2024.1080p.mkv"
+        self.file_size = random.randint(1 << 20, 1 << 31)
+
+
+class FakeChannelPost:
+    def __init__(self, index):
+        self.empty = False
+        self.media = enums.MessageMediaType.DOCUMENT
+        self.document = FakeDocument(index)
+        self.caption = f"load test caption {index}"
+
+
+class FakeClient:
+    def __init__(self, index_messages=100):
+        self.index_messages = index_messages
+
+    async def listen(self, chat_id, user_id):
+        return FakeMessage(chat_id, FakeUser(user_id), text="load test")
+
+    async def iter_messages(self, chat_id, last_msg_id, skip=0):
+        for index in range(skip, min(last_msg_id, self.index_messages)):
+            yield FakeChannelPost(index)
+
+
+# ─────────────────────────────────────
+# 🎬 SCENARIOS
+# ─────────────────────────────────────
+def build_scenarios(keyword, index_db):
+    db_types = tier_names()
+
+    def search(client, user):
+        data = f"admin_search_db#{random.choice(db_types)}#0#{search_key(keyword)}"
+        return admin_search_db(client, FakeCallbackQuery(data, user))
+
+    def stats(client, user):
+        return admin_stats(client, FakeCallbackQuery("admin_stats", user))
+
+    def home(client, user):
+        return admin_home(client, FakeCallbackQuery("admin_home", user))
+
+    def index(client, user):
+        data = f"index_db#{index_db}#-100{user.id}#{client.index_messages}#0"
+        return index_with_db(client, FakeCallbackQuery(data, user))
+
+    return {"search": search, "stats": stats, "home": home, "index": index}
+
+
+# ─────────────────────────────────────
+# 📈 MEASUREMENT
+# ─────────────────────────────────────
+async def sample_loop_lag(lags, stop):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(LAG_TICK)
+        lags.append(max(time.perf_counter() - start - LAG_TICK, 0))
+
+
+def cleanup_index_docs() -> int:
+    """
+    Remove every doc this run's index scenario wrote (all tiers)
+    """
+    # save_file cleans "." → " " in file names
+    flt = {"file_name": {"$regex": f"^zz loadtest {RUN_ID} "}}
+    removed = 0
+    for tier in get_tiers():
+        ids = [doc["_id"] for doc in tier.col.find(flt, {"_id": 1})]
+        for i in range(0, len(ids), 1000):
+            chunk = ids[i:i + 1000]
+            removed += tier.col.delete_many({"_id": {"$in": chunk}}).deleted_count
+            tier.caption_col.delete_many({"_id": {"$in": chunk}})
+    return removed
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(int(len(values) * pct / 100), len(values) - 1)]
+
+
+def report(name, values):
+    if not values:
+        return f"{name:<10} no samples"
+    ms = [v * 1000 for v in values]
+    return (
+        f"{name:<10} n={len(ms):<6} "
+        f"p50={percentile(ms, 50):8.2f}ms "
+        f"p95={percentile(ms, 95):8.2f}ms "
+        f"p99={percentile(ms, 99):8.2f}ms "
+        f"max={max(ms):8.2f}ms "
+        f"mean={statistics.fmean(ms):8.2f}ms"
+    )
+
+
+async def run(args):
+    if not temp.START_TIME:
+        temp.START_TIME = time.time()
+
+    # plugins were imported before asyncio.run → start it in this loop
+    # (search warm-up stays off so it does not skew the numbers)
+    watchdog.start()
+
+    scenarios = build_scenarios(args.keyword, args.index_db)
+    picked = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(picked) - set(scenarios)
+    if unknown:
+        raise SystemExit(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    client = FakeClient(index_messages=args.index_messages)
+    user = FakeUser(ADMINS[0] if ADMINS else 0)
+
+    latencies = {name: [] for name in picked}
+    errors = {name: 0 for name in picked}
+    lags = []
+    stop = asyncio.Event()
+    queue = asyncio.Queue()
+    for i in range(args.requests):
+        queue.put_nowait(picked[i % len(picked)])
+
+    async def worker():
+        while not queue.empty():
+            name = queue.get_nowait()
+            start = time.perf_counter()
+            try:
+                await scenarios[name](client, user)
+            except Exception as e:
+                errors[name] += 1
+                if args.verbose:
+                    print(f"[{name}] {type(e).__name__}: {e}")
+            latencies[name].append(time.perf_counter() - start)
+
+    lag_task = asyncio.create_task(sample_loop_lag(lags, stop))
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    finally:
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await lag_task
+        if "index" in picked:
+            removed = await asyncio.to_thread(cleanup_index_docs)
+            print(f"Cleanup  : removed {removed} load-test files")
+
+    done = sum(len(v) for v in latencies.values())
+    print(f"\nRequests : {done} in {elapsed:.2f}s → {done / elapsed:.1f} req/s")
+    print(f"Workers  : {args.concurrency}\n")
+    for name in picked:
+        print(report(name, latencies[name]) + f" errors={errors[name]}")
+    print()
+    print(report("loop lag", lags))
+    for key, entry in watchdog.top(5):
+        print(
+            f"  blocked in {key}: {entry['count']}x, "
+            f"total {entry['total'] * 1000:.0f}ms, max {entry['max'] * 1000:.0f}ms"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Admin handler load test")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--scenarios", default="search,stats,home")
+    parser.add_argument("--keyword", default="")
+    parser.add_argument("--index-db", default="primary")
+    parser.add_argument("--index-messages", type=int, default=100)
+    parser.add_argument("--verbose", action="store_true")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
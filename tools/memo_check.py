@@ -0,0 +1,93 @@
+# tools/memo_check.py
+"""
+End-to-end check of database.file_cache.FileMemo against a real Mongo
+
+Needs a single-node replica set for the change stream part, e.g.
+    mongod --replSet rs0 --dbpath /tmp/rs0 --port 27017
+    mongosh --eval 'rs.initiate()'
+
+Usage:
+    python -m tools.memo_check "mongodb://localhost:27017/?replicaSet=rs0&directConnection=true"
+
+Works in a throwaway database (memo_check_<pid>) that is dropped at the
+end; exits 1 on the first failed expectation.
+"""
+import os
+import sys
+import time
+
+from pymongo import MongoClient
+
+from database.file_cache import FileMemo
+
+WAIT_SECONDS = 10
+
+
+def wait_for(predicate, what):
+    deadline = time.time() + WAIT_SECONDS
+    while time.time() < deadline:
+        if predicate():
+            print(f"  ✓ {what}")
+            return
+        time.sleep(0.05)
+    print(f"  ✗ {what}")
+    sys.exit(1)
+
+
+def check_change_stream(col):
+    print("change stream mode")
+    memo = FileMemo(ttl=3600)
+    memo.watch("test", col)
+    wait_for(lambda: "test" in memo.live, "stream is live")
+
+    token = memo.count_token("test")
+    memo.set_count("test", col.count_documents({}), token)
+    memo.set_details("a", "test", {"_id": "a", "file_name": "a"})
+
+    col.insert_one({"_id": "b", "file_name": "b"})
+    wait_for(lambda: memo.get_count("test") == 2, "insert from another client bumps count")
+
+    col.delete_one({"_id": "a"})
+    wait_for(lambda: memo.get_count("test") == 1, "delete lowers count")
+    wait_for(lambda: memo.get_details("a") is None, "delete drops cached details")
+
+    memo.set_details("b", "test", {"_id": "b", "file_name": "b"})
+    col.update_one({"_id": "b"}, {"$set": {"file_name": "b2"}})
+    wait_for(lambda: memo.get_details("b") is None, "update drops cached details")
+
+    # event landing while a count runs → count not cached
+    token = memo.count_token("test")
+    col.insert_one({"_id": "c", "file_name": "c"})
+    wait_for(lambda: memo.count_token("test") != token, "insert event observed")
+    memo.set_count("test", 999, token)
+    wait_for(lambda: memo.get_count("test") is None, "racing count is discarded")
+
+
+def check_ttl(col):
+    print("TTL mode (no watcher)")
+    memo = FileMemo(ttl=0.5)
+    memo.set_count("test", col.count_documents({}))
+    memo.set_details("b", "test", {"_id": "b"})
+    wait_for(lambda: memo.get_count("test") is not None, "count cached")
+    wait_for(lambda: memo.get_count("test") is None, "count expires")
+    wait_for(lambda: memo.get_details("b") is None, "details expire")
+
+
+def main():
+    url = sys.argv[1] if len(sys.argv) > 1 else "mongodb://localhost:27017/?directConnection=true"
+    client = MongoClient(url, serverSelectionTimeoutMS=5000)
+    db_name = f"memo_check_{os.getpid()}"
+    col = client[db_name]["files"]
+
+    try:
+        col.insert_one({"_id": "a", "file_name": "a"})
+        check_change_stream(col)
+        check_ttl(col)
+    finally:
+        client.drop_database(db_name)
+
+    print("all checks passed")
+
+
+if __name__ == "__main__":
+    main()